@@ -1,17 +1,55 @@
+import os
+
 from flask import Flask
 from src.clients.clob import ClobAPIClient
 from src.api.clob import register_clob_routes
+from src.api.markets import register_market_routes
+from src.api.alerts import register_alert_routes
+from src.api.pricing import register_pricing_routes
+from src.api.profiling import register_profiling
+from src.api.stream import register_stream_routes
+from src.clients.quote_feed import PollingQuoteFeed
+from src.core.alerts import AlertClock, AlertEngine, QueuedNotifier
+from src.core.stream import QuoteHub
+
+DEFAULT_SNAPSHOT_PATH = "markets.snap"
 
 
-def create_app():
+def create_app(snapshot_path=None, alert_notifier=None):
     """Create and configure the Flask application"""
     app = Flask(__name__)
     
+    # Opt-in request tracing: X-Profile: 1 header or POLYMARKET_PROFILE=1
+    register_profiling(app)
+    
     # Initialize CLOB client
     clob_client = ClobAPIClient()
     
     # Register CLOB routes
     register_clob_routes(app, clob_client)
+    register_pricing_routes(app, clob_client)
+
+    # Market table served from the mmap snapshot
+    snapshot_path = snapshot_path or os.environ.get("POLYMARKET_SNAPSHOT", DEFAULT_SNAPSHOT_PATH)
+    holder = register_market_routes(app, snapshot_path)
+
+    # Alert subscriptions; fired alerts go to ALERT_WEBHOOK_URL when set
+    if alert_notifier is None and os.environ.get("ALERT_WEBHOOK_URL"):
+        from src.clients.webhook import WebhookNotifier  # pulls in requests
+        alert_notifier = WebhookNotifier(os.environ["ALERT_WEBHOOK_URL"])
+    if alert_notifier is not None:
+        # Delivered from a worker thread, never on the request path
+        alert_notifier = QueuedNotifier(alert_notifier)
+    alert_engine = AlertEngine(notifier=alert_notifier)
+    app.extensions["alert_engine"] = alert_engine
+    alert_clock = AlertClock(alert_engine, interval=float(os.environ.get("ALERT_TICK_SECONDS", 30.0)))
+    register_alert_routes(app, alert_engine, holder, alert_clock)
+
+    # Live quote stream: one upstream poller shared by all subscribers
+    quote_hub = QuoteHub()
+    quote_feed = PollingQuoteFeed(clob_client, quote_hub,
+                                  interval=float(os.environ.get("QUOTE_POLL_SECONDS", 1.0)))
+    register_stream_routes(app, quote_hub, quote_feed)
     
     # Health check endpoint
     @app.route('/health', methods=['GET'])
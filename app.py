@@ -2,11 +2,17 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timezone
 import json
+import os
 import requests
 
 from src.clients.gamma import fetch_markets
 from src.clients.clob import ClobAPIClient
-from src.core.parse import parse_yes_no, hours_to_close, hours_to_close
+from src.core.parse import normalize_market
+from src.core.pricing import Position, mark_positions
+from src.core.diff import diff_snapshots
+from src.core.liquidity import LIQUIDITY_COLUMNS, market_liquidity
+from src.core.profiling import Trace, TraceStore, clear as clear_trace, env_enabled, format_spans, span
+from src.core.snapshot import Snapshot, write_snapshot
 
 
 # API client for CLOB endpoints
@@ -45,46 +51,43 @@ class ClobAPI:
                     ask = res.get("price")
             return {"bid": bid, "ask": ask}
         return result
+    
+    def stream_quotes(self, token_ids: list, interval: float = 0.5):
+        """GET /stream/quotes - Yield lists of quote updates as the server pushes them"""
+        params = {"token_ids": ",".join(token_ids), "interval": interval}
+        with requests.get(f"{self.base_url}/stream/quotes", params=params, stream=True) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: ") and event == "quotes":
+                    yield json.loads(line[len("data: "):])["quotes"]
 
 st.set_page_config(page_title="Polymarket Dashboard", layout="wide")
 st.title("Polymarket Market Dashboard")
 
+# Opt-in profiling of this rerun: POLYMARKET_PROFILE=1 or ?profile=1 (see src/core/profiling.py)
+clear_trace()  # a previous run cut short by st.rerun() never reached the end of the script
+run_trace = Trace("dashboard.rerun").start() \
+    if env_enabled() or st.query_params.get("profile") == "1" else None
+
 @st.cache_data
 def load_data(limit=None, offset=None):
     raw_markets = fetch_markets(limit=limit, offset=offset)  # markets with optional pagination
-    clob_client = ClobAPIClient()  
-    records = []
+    with span("parse", markets=len(raw_markets)):
+        return [normalize_market(m) for m in raw_markets]
 
-    for m in raw_markets:
-        yes_price, no_price, yes_token, no_token, invalid_reason = parse_yes_no(m)
-        hours = hours_to_close(m.get("endDate"))
+# Pre-built market snapshot (see src/core/snapshot.py); opened once per process
+SNAPSHOT_PATH = os.environ.get("POLYMARKET_SNAPSHOT", "markets.snap")
+# Columns the dashboard reads; everything else in the snapshot stays unmapped
+SNAPSHOT_COLUMNS = ["id", "slug", "question", "category", "endDate", "enableOrderBook",
+                    "active", "closed", "yes_token_id", "no_token_id", "yes_price",
+                    "no_price", "invalid_reason", "clob_token_ids"]
 
-        # Extract CLOB token IDs from the market data
-        clob_token_ids_str = m.get("clobTokenIds", "[]")
-        import ast
-        try:
-            clob_token_ids = ast.literal_eval(clob_token_ids_str) if isinstance(clob_token_ids_str, str) else clob_token_ids_str
-        except:
-            clob_token_ids = []
-
-        records.append({
-            "id": m.get("id"),
-            "slug": m.get("slug"),
-            "question": m.get("question"),
-            "category": m.get("category"),
-            "endDate": m.get("endDate"),
-            "hours_to_close": hours,
-            "enableOrderBook": m.get("fpmmLive", False),
-            "active": m.get("active", False),
-            "closed": m.get("closed", False),
-            "yes_token_id": yes_token,
-            "no_token_id": no_token,
-            "yes_price": yes_price,
-            "no_price": no_price,
-            "invalid_reason": invalid_reason,
-            "clob_token_ids": clob_token_ids
-        })
-    return records
+@st.cache_resource
+def open_snapshot(path, mtime):
+    return Snapshot(path)
 
 # Add pagination controls
 st.sidebar.header("Pagination Settings")
@@ -96,11 +99,41 @@ if use_pagination:
     limit = st.sidebar.number_input("Limit (items per page)", value=50, min_value=1, max_value=1000)
     offset = st.sidebar.number_input("Offset (starting position)", value=0, min_value=0)
 
-# Load data
-records = load_data(limit=limit, offset=offset)
-df = pd.DataFrame(records)
-
-st.sidebar.write(f"Loaded {len(records)} markets{' (with pagination)' if use_pagination else ''}")
+# Load data: snapshot if one exists (and no pagination), otherwise fetch from Gamma
+use_snapshot = not use_pagination and os.path.exists(SNAPSHOT_PATH)
+if use_snapshot:
+    snapshot = open_snapshot(SNAPSHOT_PATH, os.stat(SNAPSHOT_PATH).st_mtime_ns)
+    with span("snapshot.to_frame"):
+        df = snapshot.to_frame(SNAPSHOT_COLUMNS)
+    # hours_to_close is relative to now, so recompute it instead of using the stored value
+    end_dates = pd.to_datetime(df["endDate"], utc=True, errors="coerce", format="ISO8601")
+    df["hours_to_close"] = ((end_dates - pd.Timestamp.now(tz="UTC")).dt.total_seconds() / 3600).round(2)
+else:
+    records = load_data(limit=limit, offset=offset)
+    with span("dataframe.build", rows=len(records)):
+        df = pd.DataFrame(records)
+
+st.sidebar.write(f"Loaded {len(df)} markets{' (with pagination)' if use_pagination else ''}"
+                 f"{f' from snapshot {SNAPSHOT_PATH}' if use_snapshot else ''}")
+if st.sidebar.button("Refresh snapshot"):
+    previous = Snapshot(SNAPSHOT_PATH) if os.path.exists(SNAPSHOT_PATH) else None
+    write_snapshot([normalize_market(m) for m in fetch_markets()], SNAPSHOT_PATH)
+    if previous is not None:
+        st.session_state.last_changes = diff_snapshots(previous, Snapshot(SNAPSHOT_PATH),
+                                                       price_threshold=0.05)
+    st.rerun()
+
+# What changed in the last snapshot refresh (only the changed rows are shown)
+if use_snapshot and st.session_state.get("last_changes") is not None:
+    changes = st.session_state.last_changes
+    with st.expander(f"Changes since last refresh: {len(changes.added)} new, {len(changes.removed)} removed, "
+                     f"{len(changes.changed)} changed, {len(changes.closed)} closed"):
+        st.write(f"Entered candidates: {len(changes.entered_candidates)}, "
+                 f"left candidates: {len(changes.left_candidates)}, "
+                 f"YES price moves > 5c: {len(changes.price_moves)}")
+        if changes.rows:
+            st.dataframe(snapshot.to_frame(["category", "question", "yes_price", "no_price", "slug"],
+                                           rows=changes.rows))
 
 # Store original unfiltered dataframe for "Show All Data" functionality
 df_all = df.copy()
@@ -126,8 +159,22 @@ def is_candidate(row):
     return True
 
 
-df["is_candidate"] = df.apply(is_candidate, axis=1)
-df_candidates = df[df["is_candidate"]]
+with span("filter", rows=len(df)):
+    df["is_candidate"] = df.apply(is_candidate, axis=1)
+    df_candidates = df[df["is_candidate"]]
+
+# Liquidity analytics: books of every candidate token in chunked batches,
+# metrics computed vectorized (src/core/liquidity.py)
+@st.cache_data(ttl=30)
+def load_liquidity(yes_token_ids, no_token_ids):
+    return market_liquidity(ClobAPIClient(), list(yes_token_ids), list(no_token_ids))
+
+use_liquidity = st.sidebar.checkbox("Liquidity analytics (order books)", value=False)
+rank_focus_by_liquidity = use_liquidity and st.sidebar.checkbox("Rank focus by liquidity", value=True)
+if use_liquidity and not df_candidates.empty:
+    with span("liquidity", markets=len(df_candidates)):
+        metrics = load_liquidity(tuple(df_candidates["yes_token_id"]), tuple(df_candidates["no_token_id"]))
+        df_candidates = df_candidates.assign(**metrics)
 
 # Initialize session state for filter status
 if 'display_mode' not in st.session_state:
@@ -154,9 +201,12 @@ else:  # candidates
     # Show candidate data (with 48h/active, etc. filters)
     display_df = df_candidates
 
-st.dataframe(display_df[
-    ["category", "question", "endDate", "hours_to_close", "yes_price", "no_price", "slug"]
-])
+with span("render.table", rows=len(display_df)):
+    # Liquidity columns (when computed) are sortable like the rest: click a header
+    st.dataframe(display_df[
+        ["category", "question", "endDate", "hours_to_close", "yes_price", "no_price", "slug"]
+        + [c for c in LIQUIDITY_COLUMNS if c in display_df.columns]
+    ])
 
 # Three option buttons
 col1, col2, col3 = st.columns(3)
@@ -219,7 +269,7 @@ else:  # candidates
     st.info(f"Showing {len(df_candidates)} candidate markets (with 48h/active filters)")
 
 # Focus = 2 (crypto + sports)
-from src.core.select_focus import pick_focus
+from src.core.select_focus import liquidity_rank, pick_focus
 from src.core.models import MarketRecord
 
 def select_focus_df(df):
@@ -241,11 +291,12 @@ def select_focus_df(df):
             yes_price=row["yes_price"],
             no_price=row["no_price"],
             invalid_reason=row["invalid_reason"],
-            clob_token_ids=row["clob_token_ids"]
+            clob_token_ids=row["clob_token_ids"],
+            **{c: row[c] for c in LIQUIDITY_COLUMNS if c in row}
         )
         market_records.append(record)
     
-    selected_records = pick_focus(market_records)
+    selected_records = pick_focus(market_records, key=liquidity_rank if rank_focus_by_liquidity else None)
     if selected_records:
         # Convert back to dataframe
         selected_data = []
@@ -256,7 +307,8 @@ def select_focus_df(df):
                 "yes_price": record.yes_price,
                 "no_price": record.no_price,
                 "slug": record.slug,
-                "category": record.category
+                "category": record.category,
+                **{c: getattr(record, c) for c in LIQUIDITY_COLUMNS}
             })
         return pd.DataFrame(selected_data)
     else:
@@ -279,12 +331,21 @@ else:
     # Default: use candidate data for focus selection (already has 48h condition)
     focus_df = df_candidates
 
-df_focus = select_focus_df(focus_df)
+# Filtered/all views may predate (or never get) the metrics: compute them for
+# the focus pool itself, else ranking would silently fall back to first match
+if use_liquidity and not focus_df.empty and not set(LIQUIDITY_COLUMNS) <= set(focus_df.columns):
+    with span("liquidity", markets=len(focus_df)):
+        metrics = load_liquidity(tuple(focus_df["yes_token_id"]), tuple(focus_df["no_token_id"]))
+        focus_df = focus_df.assign(**metrics)
+
+with span("focus"):
+    df_focus = select_focus_df(focus_df)
 st.subheader("Focus = 2 Markets (1 Crypto + 1 Sports)")
 if not df_focus.empty:
     # Show category along with other fields for clarity
     st.dataframe(df_focus[
         ["category", "question", "hours_to_close", "yes_price", "no_price", "slug"]
+        + (list(LIQUIDITY_COLUMNS) if use_liquidity else [])
     ])
 else:
     st.write("No focus markets available.")
@@ -433,30 +494,43 @@ with st.form("batch_prices_form"):
         
         if requests_list:
             if use_direct_batch:
-                # Use direct client for batch requests
-                results = []
-                for req in requests_list:
-                    token_id = req["token_id"]
-                    side = req["side"]
-                    try:
-                        # For the ClobAPIClient, side="BUY" gets the ask price (what you'd pay to buy)
-                        # and side="SELL" gets the bid price (what you'd get for selling)
-                        price = clob_client.get_price(token_id, side=side)
-                        results.append({
-                            "token_id": token_id,
-                            "side": side,
-                            "price": price
-                        })
-                    except Exception as e:
-                        results.append({
-                            "token_id": token_id,
-                            "side": side,
-                            "error": str(e)
-                        })
+                # One chunked upstream batch call instead of a request per line.
+                # side="BUY" gets the ask price (what you'd pay to buy) and
+                # side="SELL" gets the bid price (what you'd get for selling)
+                results = clob_client.get_prices(requests_list)
                 st.json({"results": results})
             else:
                 result = api_client.get_best_bid_ask_batch(requests_list)
                 st.json(result)
 
+# Position valuation
+st.write("### Value Positions")
+with st.form("value_positions_form"):
+    st.write("Enter positions (one per line, format: token_id,side,size)")
+    positions_input = st.text_area("Positions (format: token_id,side,size per line):\nexample_token_id,SELL,250")
+    positions_submitted = st.form_submit_button("Value Positions")
+    if positions_submitted and positions_input:
+        positions = []
+        for line in positions_input.strip().split('\n'):
+            parts = [p.strip() for p in line.split(',')]
+            if len(parts) == 3:
+                try:
+                    positions.append(Position(parts[0], parts[1].upper(), float(parts[2])))
+                except ValueError:
+                    st.warning(f"Skipping line with invalid size: {line}")
+        if positions:
+            try:
+                values = mark_positions(clob_client, positions)
+                st.dataframe(pd.DataFrame([v.to_dict() for v in values]), use_container_width=True)
+            except ValueError as e:
+                st.error(str(e))
+
 st.info("Note: Check 'Use direct CLOB client' to bypass the API server and use the CLOB client directly. Otherwise, make sure to run the API server with 'python run_api.py' for API endpoint functionality.")
 
+if run_trace is not None:
+    run_trace.finish()
+    TraceStore().save(run_trace)
+    with st.sidebar.expander(f"Profile: {run_trace.duration_ms:.0f} ms ({run_trace.id})"):
+        st.code(format_spans(run_trace.to_dict()["spans"]))
+        if run_trace.profile_text:
+            st.code(run_trace.profile_text)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Alert evaluation cost per quote update
+
+Registers price/spread rules spread over a set of tokens, then replays a
+random walk of quote updates and reports the mean time per update.
+
+Usage: python benchmarks/bench_alerts.py [n_rules] [n_tokens] [n_updates]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.alerts import AlertEngine, PRICE_ABOVE, PRICE_BELOW, SPREAD_ABOVE  # noqa: E402
+
+
+def main(n_rules=100_000, n_tokens=1_000, n_updates=200_000):
+    rng = random.Random(42)
+    tokens = [f"token-{i}" for i in range(n_tokens)]
+    engine = AlertEngine()
+
+    start = time.perf_counter()
+    for _ in range(n_rules):
+        kind = rng.choice((PRICE_ABOVE, PRICE_BELOW, SPREAD_ABOVE))
+        threshold = rng.uniform(0.01, 0.2) if kind == SPREAD_ABOVE else rng.uniform(0.01, 0.99)
+        engine.add_rule(kind, threshold, token_id=rng.choice(tokens))
+    register = time.perf_counter() - start
+
+    mids = {t: 0.5 for t in tokens}
+    updates = []
+    for _ in range(n_updates):
+        token = rng.choice(tokens)
+        mids[token] = min(0.99, max(0.01, mids[token] + rng.gauss(0, 0.005)))
+        half_spread = rng.uniform(0.001, 0.01)
+        updates.append((token, mids[token] - half_spread, mids[token] + half_spread))
+
+    fired = 0
+    start = time.perf_counter()
+    for token, bid, ask in updates:
+        fired += len(engine.on_quote(token, bid=bid, ask=ask))
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_rules} rules on {n_tokens} tokens: registered in {register:.2f}s")
+    print(f"{n_updates} updates: {elapsed / n_updates * 1e6:.2f} us/update, {fired} alerts fired, "
+          f"{len(engine)} rules left")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Diff two consecutive market snapshots
+
+The second snapshot moves 1% of prices, closes 0.5% of markets, drops 0.5%
+and lists 0.5% new ones.
+
+Usage: python benchmarks/bench_diff.py [n_markets ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_snapshot import synthetic_markets  # noqa: E402
+from src.core.diff import diff_snapshots  # noqa: E402
+from src.core.parse import normalize_market  # noqa: E402
+from src.core.snapshot import Snapshot, write_snapshot  # noqa: E402
+
+
+def next_refresh(markets):
+    n = len(markets)
+    updated = [dict(m) for m in markets[: n - n // 200]]
+    for i in range(0, len(updated), 100):
+        updated[i]["outcomePrices"] = json.dumps(["0.99", "0.01"])
+    for i in range(55, len(updated), 200):
+        updated[i]["closed"] = True
+    return updated + synthetic_markets(n + n // 200)[n:]
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            old_raw = synthetic_markets(n)
+            new_raw = next_refresh(old_raw)
+            old_path = os.path.join(tmp, "old.snap")
+            new_path = os.path.join(tmp, "new.snap")
+            write_snapshot([normalize_market(m) for m in old_raw], old_path)
+            write_snapshot([normalize_market(m) for m in new_raw], new_path)
+
+            old, new = Snapshot(old_path), Snapshot(new_path)
+            start = time.perf_counter()
+            log = diff_snapshots(old, new, price_threshold=0.05)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>8} markets: {elapsed:.3f}s  added={len(log.added)} removed={len(log.removed)} "
+                  f"changed={len(log.changed)} price_moves={len(log.price_moves)} closed={len(log.closed)}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
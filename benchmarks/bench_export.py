@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the headless export over a large synthetic catalog
+
+Serves N Gamma-shaped markets from a local stub (with a simulated round
+trip per page) and runs `python -m src export` in a fresh interpreter,
+reporting runtime and peak RSS. Peak RSS should stay flat as N grows since
+only `concurrency` pages are held at a time.
+
+Usage: python benchmarks/bench_export.py [n_markets ...] [--format parquet] [--latency-ms 100]
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask, Response, request  # noqa: E402
+
+from bench_snapshot import synthetic_markets  # noqa: E402
+from src.api.replay import ServerThread  # noqa: E402
+
+
+def gamma_stub(markets, latency):
+    app = Flask(__name__)
+
+    @app.route('/markets')
+    def markets_page():
+        time.sleep(latency)
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", 100))
+        return Response(json.dumps(markets[offset:offset + limit]), content_type="application/json")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sizes", nargs="*", type=int, default=[10_000, 100_000])
+    parser.add_argument("--format", default="parquet")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    for n in args.sizes:
+        with ServerThread(gamma_stub(synthetic_markets(n), args.latency_ms / 1000)) as server, \
+                tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, f"export.{args.format}")
+            # VmHWM rather than ru_maxrss, which carries this parent's peak across exec
+            code = ("from src.__main__ import main; "
+                    f"main(['export', '-o', {out!r}, '--all', '--concurrency', '{args.concurrency}', "
+                    f"'--gamma-url', {server.url!r}]); "
+                    "print(next(int(l.split()[1]) // 1024 for l in open('/proc/self/status') "
+                    "if l.startswith('VmHWM:')))")
+            started = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+            elapsed = time.perf_counter() - started
+            if result.returncode != 0:
+                sys.exit(result.stderr)
+            print(f"{n:>8} markets -> {args.format}: {elapsed:.2f}s, peak RSS {result.stdout.strip()} MB, "
+                  f"{os.path.getsize(out) / 1e6:.1f} MB written")
+
+
+if __name__ == "__main__":
+    main()
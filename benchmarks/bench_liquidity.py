@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark liquidity metrics once the order books are local
+
+Builds random YES/NO books for N markets and times stacking them (as
+market_liquidity does: both sides of YES books, asks of NO books) and the
+vectorized metric pass, against a plain per-market Python loop. Both paths
+parse every level they read in Python, so end to end they cost about the
+same; the vectorized metrics themselves are a few ms.
+
+Usage: python benchmarks/bench_liquidity.py [markets] [levels]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.book import book_levels  # noqa: E402
+from src.core.liquidity import liquidity_metrics  # noqa: E402
+from src.core.pricing import stack_books  # noqa: E402
+
+
+def random_book(token_id, mid, levels, rng):
+    return {"asset_id": token_id,
+            "bids": [{"price": f"{mid - 0.01 * (i + 1):.2f}", "size": f"{rng.uniform(1, 500):.2f}"}
+                     for i in range(rng.randint(0, levels))],
+            "asks": [{"price": f"{mid + 0.01 * (i + 1):.2f}", "size": f"{rng.uniform(1, 500):.2f}"}
+                     for i in range(rng.randint(0, levels))]}
+
+
+def loop_metrics(books_by_id, yes_ids, no_ids, window=0.02):
+    """Reference per-market loop"""
+    out = []
+    for yes, no in zip(yes_ids, no_ids):
+        bids = book_levels(books_by_id[yes], "bids")
+        asks = book_levels(books_by_id[yes], "asks")
+        no_asks = book_levels(books_by_id[no], "asks")
+        bid, ask = (bids[0][0] if bids else None), (asks[0][0] if asks else None)
+        ref = (bid + ask) / 2 if bid is not None and ask is not None else (bid if ask is None else ask)
+        depth = 0.0
+        if ref is not None:
+            depth = sum(s for p, s in bids if p >= ref - window) + sum(s for p, s in asks if p <= ref + window)
+        out.append((ask - bid if bid is not None and ask is not None else None, depth,
+                    ask + no_asks[0][0] - 1 if ask is not None and no_asks else None))
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    levels = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    rng = random.Random(9)
+    books, yes_ids, no_ids = [], [], []
+    for i in range(n):
+        mid = round(rng.uniform(0.1, 0.9), 2)
+        books.append(random_book(f"y{i}", mid, levels, rng))
+        books.append(random_book(f"n{i}", round(1 - mid, 2), levels, rng))
+        yes_ids.append(f"y{i}")
+        no_ids.append(f"n{i}")
+
+    started = time.perf_counter()
+    stacked = stack_books(books[0::2])
+    no_stacked = stack_books(books[1::2], sides=("asks",))
+    stack_time = time.perf_counter() - started
+    started = time.perf_counter()
+    liquidity_metrics(stacked, yes_ids, no_ids, no_stacked=no_stacked)
+    metric_time = time.perf_counter() - started
+
+    books_by_id = {b["asset_id"]: b for b in books}
+    started = time.perf_counter()
+    loop_metrics(books_by_id, yes_ids, no_ids)
+    loop_time = time.perf_counter() - started
+
+    print(f"{n} markets ({2 * n} books, up to {levels} levels per side)")
+    print(f"  stack_books: {stack_time * 1000:.0f} ms (level parsing, once per book refresh)")
+    print(f"  liquidity_metrics: {metric_time * 1000:.1f} ms")
+    print(f"  stacked total: {(stack_time + metric_time) * 1000:.0f} ms")
+    print(f"  per-market Python loop (parsing the same levels): {loop_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch position valuation against a stub CLOB
+
+The stub answers /books batches after a fixed simulated round trip, so the
+numbers show how chunking, token dedupe and concurrent chunks hide upstream
+latency, plus the cost of the vectorized fill.
+
+Usage: python benchmarks/bench_pricing.py [positions] [tokens] [latency_ms]
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.clients.clob import ClobAPIClient  # noqa: E402
+from src.core.pricing import Position, mark_positions, stack_books, value_positions  # noqa: E402
+
+LEVELS = 20
+
+
+class StubClob(ClobAPIClient):
+    """ClobAPIClient whose /books batches are served locally after a delay"""
+
+    def __init__(self, latency, seed=3):
+        super().__init__()
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.tokens_requested = 0
+        self._lock = threading.Lock()
+
+    def _book(self, token_id):
+        rng = random.Random(token_id)
+        mid = rng.uniform(0.05, 0.95)
+        bids = [{"price": f"{mid - 0.005 - i * 0.01:.3f}", "size": f"{rng.uniform(10, 500):.2f}"}
+                for i in range(LEVELS)]
+        asks = [{"price": f"{mid + 0.005 + i * 0.01:.3f}", "size": f"{rng.uniform(10, 500):.2f}"}
+                for i in range(LEVELS)]
+        return {"asset_id": token_id, "bids": bids, "asks": asks}
+
+    def get_order_books(self, token_ids):
+        with self._lock:
+            self.calls += 1
+            self.tokens_requested += len(token_ids)
+        time.sleep(self.latency)
+        return [self._book(t) for t in token_ids]
+
+
+def main():
+    n_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_tokens = int(sys.argv[2]) if len(sys.argv) > 2 else 4_000
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 150) / 1000
+
+    rng = random.Random(11)
+    positions = [Position(f"tok{rng.randrange(n_tokens)}", rng.choice(("BUY", "SELL")),
+                          round(rng.uniform(1, 3000), 2)) for _ in range(n_positions)]
+    clob = StubClob(latency)
+
+    started = time.perf_counter()
+    values = mark_positions(clob, positions)
+    total = time.perf_counter() - started
+    print(f"{n_positions} positions over {n_tokens} tokens, {latency * 1000:.0f} ms upstream latency")
+    print(f"  mark_positions: {total:.2f}s, {clob.calls} upstream calls, "
+          f"{clob.tokens_requested} tokens requested")
+
+    books = clob.get_order_books_chunked(list({p.token_id for p in positions}))
+    started = time.perf_counter()
+    stacked = stack_books(books)
+    stack_time = time.perf_counter() - started
+    started = time.perf_counter()
+    value_positions(stacked, positions)
+    value_time = time.perf_counter() - started
+    print(f"  stack_books: {stack_time * 1000:.0f} ms, value_positions: {value_time * 1000:.0f} ms")
+
+    filled = sum(v.filled == v.size for v in values)
+    print(f"  fully filled: {filled}/{n_positions}")
+    print(f"  serial per-position lookups would wait ~{n_positions * latency:.0f}s on latency alone")
+
+
+if __name__ == "__main__":
+    main()
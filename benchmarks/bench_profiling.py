@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Overhead of the profiling hooks when profiling is off (and on)
+
+Micro: a plain function vs. the same function behind @traced / span() with
+no active trace. Macro: Flask requests without the hooks, with the hooks
+registered but not triggered, and with X-Profile: 1.
+
+Usage: python benchmarks/bench_profiling.py [calls] [requests]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from src.api.profiling import register_profiling  # noqa: E402
+from src.core.profiling import TraceStore, span, traced  # noqa: E402
+
+
+def plain(x):
+    return x + 1
+
+
+@traced("bench")
+def decorated(x):
+    return x + 1
+
+
+def with_span(x):
+    with span("bench"):
+        return x + 1
+
+
+def per_call_ns(fn, calls):
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - started) / calls * 1e9
+
+
+def app_with(hooks, store_dir):
+    app = Flask(__name__)
+    if hooks:
+        register_profiling(app, TraceStore(store_dir), threshold_ms=10_000)
+
+    @app.route('/work')
+    def work():
+        return {"result": sum(decorated(i) for i in range(100))}
+
+    return app
+
+
+def per_request_us(app, requests, headers=None):
+    client = app.test_client()
+    for _ in range(50):  # warm up
+        client.get("/work", headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get("/work", headers=headers)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    base = per_call_ns(plain, calls)
+    print(f"plain call: {base:.0f} ns")
+    print(f"@traced, tracing off: {per_call_ns(decorated, calls):.0f} ns")
+    print(f"span(), tracing off: {per_call_ns(with_span, calls):.0f} ns")
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        no_hooks = per_request_us(app_with(False, store_dir), requests)
+        hooks_off = per_request_us(app_with(True, store_dir), requests)
+        hooks_on = per_request_us(app_with(True, store_dir), requests // 4, headers={"X-Profile": "1"})
+    print(f"Flask request, no hooks: {no_hooks:.0f} us")
+    print(f"Flask request, hooks registered, not profiling: {hooks_off:.0f} us "
+          f"({(hooks_off / no_hooks - 1) * 100:+.1f}%)")
+    print(f"Flask request, X-Profile: 1 (spans + cProfile + store): {hooks_on:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: JSON -> normalize -> DataFrame vs. mmap snapshot
+
+Each measurement runs in a fresh interpreter so time and peak RSS reflect
+what a new Streamlit/Flask process pays before it can render the table.
+
+Usage: python benchmarks/bench_snapshot.py [n_markets ...]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DISPLAY_COLUMNS = ["category", "question", "endDate", "hours_to_close", "yes_price", "no_price", "slug"]
+CATEGORIES = ["Crypto", "Sports", "Politics", "Pop Culture", "Business", "Science"]
+
+
+def synthetic_markets(n):
+    """Gamma-shaped raw markets"""
+    markets = []
+    for i in range(n):
+        markets.append({
+            "id": str(500000 + i),
+            "slug": f"market-{i}-will-something-happen",
+            "question": f"Will event number {i} happen before the deadline?",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "endDate": "2030-01-01T00:00:00Z",
+            "fpmmLive": i % 3 != 0,
+            "active": True,
+            "closed": i % 10 == 0,
+            "outcomes": '["Yes", "No"]',
+            "outcomePrices": json.dumps([str(round((i % 100) / 100, 2)), str(round(1 - (i % 100) / 100, 2))]),
+            "clobTokenIds": json.dumps([str(10**70 + 2 * i), str(10**70 + 2 * i + 1)]),
+        })
+    return markets
+
+
+def run_json(path):
+    import pandas as pd
+    from src.core.parse import normalize_market
+
+    with open(path) as f:
+        raw = json.load(f)
+    df = pd.DataFrame([normalize_market(m) for m in raw])
+    return df[DISPLAY_COLUMNS]
+
+
+def run_snapshot(path):
+    from src.core.snapshot import Snapshot
+
+    return Snapshot(path).to_frame(DISPLAY_COLUMNS)
+
+
+def child(mode, path):
+    start = time.perf_counter()
+    df = run_json(path) if mode == "json" else run_snapshot(path)
+    elapsed = time.perf_counter() - start
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb, "rows": len(df)}))
+
+
+def measure(mode, path):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main(sizes):
+    from src.core.parse import normalize_market
+    from src.core.snapshot import write_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'markets':>8} {'path':>9} {'seconds':>8} {'peak RSS MB':>12}")
+        for n in sizes:
+            raw = synthetic_markets(n)
+            json_path = os.path.join(tmp, f"markets_{n}.json")
+            snap_path = os.path.join(tmp, f"markets_{n}.snap")
+            with open(json_path, "w") as f:
+                json.dump(raw, f)
+            write_snapshot([normalize_market(m) for m in raw], snap_path)
+            for mode, path in (("json", json_path), ("snapshot", snap_path)):
+                r = measure(mode, path)
+                print(f"{n:>8} {mode:>9} {r['seconds']:>8.3f} {r['rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main([int(a) for a in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Offline load test against the replay stub server
+
+Replays every request of a fixture file from concurrent workers through the
+real clients' HTTP path and reports throughput, latency percentiles and
+errors. Without a fixture file a synthetic Gamma/CLOB session is generated.
+
+Usage: python benchmarks/load_replay.py [fixture.ndjson.gz] [workers] [rounds] [latency_spec] [error_rate]
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from src.api.replay import ServerThread, create_replay_app  # noqa: E402
+from src.core.fixtures import Exchange, FixtureSet, FixtureWriter  # noqa: E402
+
+
+def synthetic_fixture(path, markets=2000, tokens=200, seed=5):
+    """A recorded-looking session: paged /markets plus /book and /midpoint calls"""
+    rng = random.Random(seed)
+    with FixtureWriter(path) as writer:
+        for offset in range(0, markets, 100):
+            page = [{"id": str(i), "question": f"Market {i}?", "outcomePrices": '["0.5", "0.5"]'}
+                    for i in range(offset, offset + 100)]
+            writer.write(Exchange("gamma", "GET", "markets", f"limit=100&offset={offset}", "", 200,
+                                  "application/json", json.dumps(page), rng.lognormvariate(5, 0.4)))
+        for t in range(tokens):
+            book = {"asset_id": f"tok{t}", "bids": [{"price": "0.48", "size": "100"}],
+                    "asks": [{"price": "0.52", "size": "100"}]}
+            writer.write(Exchange("clob", "GET", "book", f"token_id=tok{t}", "", 200,
+                                  "application/json", json.dumps(book), rng.lognormvariate(4, 0.5)))
+            writer.write(Exchange("clob", "GET", "midpoint", f"token_id=tok{t}", "", 200,
+                                  "application/json", json.dumps({"mid": "0.5"}), rng.lognormvariate(4, 0.5)))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def main():
+    fixture = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] != "-" else None
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    latency = sys.argv[4] if len(sys.argv) > 4 else "recorded"
+    error_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    if fixture is None:
+        fixture = os.path.join(tempfile.mkdtemp(), "synthetic.ndjson.gz")
+        synthetic_fixture(fixture)
+    fixtures = FixtureSet.load(fixture)
+    app = create_replay_app(fixtures, latency=latency, error_rate=error_rate, seed=1)
+
+    with ServerThread(app) as server:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=workers)
+        session.mount("http://", adapter)
+
+        def call(exchange):
+            url = f"{server.url}/{exchange.upstream}/{exchange.path}"
+            if exchange.query:
+                url += "?" + exchange.query
+            started = time.perf_counter()
+            resp = session.request(exchange.method, url, data=exchange.body or None,
+                                   headers={"Content-Type": "application/json"})
+            return time.perf_counter() - started, resp.status_code
+
+        work = fixtures.exchanges * rounds
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(call, work))
+        elapsed = time.perf_counter() - started
+
+    latencies = [r[0] * 1000 for r in results]
+    failed = sum(1 for r in results if r[1] >= 400)
+    print(f"{len(work)} requests ({len(fixtures)} recorded x {rounds}), {workers} workers, latency={latency}")
+    print(f"  {elapsed:.2f}s, {len(work) / elapsed:.0f} req/s, {failed} failed "
+          f"(server stats {app.extensions['replay'].to_dict()})")
+    print(f"  latency ms: p50 {percentile(latencies, 50):.1f}  p90 {percentile(latencies, 90):.1f}  "
+          f"p99 {percentile(latencies, 99):.1f}")
+
+
+if __name__ == "__main__":
+    main()
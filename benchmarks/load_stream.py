@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Load test for the live quote stream against a stub CLOB feed
+
+In-process: thousands of subscriptions on one QuoteHub fed by a single
+PollingQuoteFeed. 10% of the subscribers never read, to check that slow
+consumers stay bounded. HTTP: a smaller number of real SSE clients against
+the Flask endpoint served by werkzeug.
+
+Usage: python benchmarks/load_stream.py [subscribers] [tokens] [ticks] [http_clients]
+"""
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from flask import Flask  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from src.api.stream import register_stream_routes  # noqa: E402
+from src.clients.quote_feed import PollingQuoteFeed  # noqa: E402
+from src.core.stream import QuoteHub  # noqa: E402
+
+TOKENS_PER_SUBSCRIBER = 5
+
+
+class StubClob:
+    """Random-walk order books; counts upstream calls"""
+
+    def __init__(self, seed=7):
+        self.rng = random.Random(seed)
+        self.mids = {}
+        self.calls = 0
+
+    def get_order_books(self, token_ids):
+        self.calls += 1
+        books = []
+        for token_id in token_ids:
+            mid = self.mids.get(token_id, 0.5)
+            if self.rng.random() < 0.5:  # half the books move per poll
+                mid = min(0.95, max(0.05, mid + self.rng.choice((-0.01, 0.01))))
+            self.mids[token_id] = mid
+            books.append({"asset_id": token_id,
+                          "bids": [{"price": f"{mid - 0.01:.2f}", "size": "100"}],
+                          "asks": [{"price": f"{mid + 0.01:.2f}", "size": "100"}]})
+        return books
+
+
+def in_process(n_subscribers, n_tokens, ticks):
+    rng = random.Random(1)
+    tokens = [f"token-{i}" for i in range(n_tokens)]
+    hub = QuoteHub()
+    clob = StubClob()
+    feed = PollingQuoteFeed(clob, hub, batch_size=100)
+
+    subs = [hub.subscribe(rng.sample(tokens, TOKENS_PER_SUBSCRIBER), min_interval=0)
+            for _ in range(n_subscribers)]
+    slow = set(range(0, n_subscribers, 10))
+    fast = [s for i, s in enumerate(subs) if i not in slow]
+
+    received = [0]
+    lock = threading.Lock()
+
+    def consume(chunk, stop):
+        count = 0
+        while not stop.is_set():
+            for sub in chunk:
+                count += len(sub.drain())
+            time.sleep(0.01)
+        for sub in chunk:
+            count += len(sub.drain())
+        with lock:
+            received[0] += count
+
+    stop = threading.Event()
+    workers = [threading.Thread(target=consume, args=(fast[i::8], stop)) for i in range(8)]
+    for w in workers:
+        w.start()
+
+    tick_times = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        feed.poll_once()
+        tick_times.append(time.perf_counter() - started)
+    stop.set()
+    for w in workers:
+        w.join()
+
+    max_pending = max(len(subs[i]._pending) for i in slow)
+    print(f"in-process: {n_subscribers} subscribers x {TOKENS_PER_SUBSCRIBER} tokens of {n_tokens}, {ticks} ticks")
+    print(f"  upstream calls per tick: {clob.calls / ticks:.1f} (batch size 100)")
+    print(f"  poll+fan-out per tick: mean {sum(tick_times) / ticks * 1000:.1f} ms, "
+          f"max {max(tick_times) * 1000:.1f} ms")
+    print(f"  quotes delivered to fast consumers: {received[0]}")
+    print(f"  slow consumers: max pending quotes {max_pending} (bounded by tokens per subscription), "
+          f"coalesced {sum(subs[i].coalesced for i in slow)}")
+    for sub in subs:
+        sub.close()
+
+
+def over_http(n_clients, n_tokens, seconds=3.0):
+    app = Flask(__name__)
+    hub = QuoteHub()
+    clob = StubClob()
+    feed = PollingQuoteFeed(clob, hub, interval=0.1)
+    register_stream_routes(app, hub, feed)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/stream/quotes"
+
+    rng = random.Random(2)
+    tokens = [f"token-{i}" for i in range(n_tokens)]
+    events = [0] * n_clients
+
+    def client(i):
+        params = {"token_ids": ",".join(rng.sample(tokens, TOKENS_PER_SUBSCRIBER)), "interval": 0.2}
+        deadline = time.monotonic() + seconds
+        with requests.get(url, params=params, stream=True, timeout=10) as resp:
+            for line in resp.iter_lines():
+                if line.startswith(b"event: quotes"):
+                    events[i] += 1
+                if time.monotonic() > deadline:
+                    break
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    feed.stop()
+    server.shutdown()
+    print(f"http: {n_clients} SSE clients for {seconds:.0f}s: {sum(events)} quote events, "
+          f"min per client {min(events)}")
+    print(f"  {feed.polls} polls of {len(clob.mids)} distinct tokens, "
+          f"{clob.calls / max(feed.polls, 1):.1f} upstream calls per poll for all clients")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    n_subscribers, n_tokens, ticks, http_clients = (args + [5000, 1000, 50, 200][len(args):])[:4]
+    in_process(n_subscribers, n_tokens, ticks)
+    if http_clients:
+        over_http(http_clients, n_tokens)
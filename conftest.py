@@ -0,0 +1,66 @@
+"""
+Shared test doubles and market/book factories, imported by the test modules
+"""
+from datetime import datetime, timedelta, timezone
+
+from src.clients.clob import ClobAPIClient
+from src.core.parse import normalize_market
+
+# Levels of the default stub book, best first
+BIDS = [(0.48, 100), (0.47, 50)]
+ASKS = [(0.52, 100), (0.55, 50)]
+
+
+def book(token_id, bids=BIDS, asks=ASKS):
+    """JSON order book (as the CLOB returns it) from (price, size) pairs"""
+    return {"asset_id": token_id,
+            "bids": [{"price": str(p), "size": str(s)} for p, s in bids],
+            "asks": [{"price": str(p), "size": str(s)} for p, s in asks]}
+
+
+def gamma_market(i, hours=None, **overrides):
+    """
+    Raw Gamma market with id i and YES/NO tokens y<i>/n<i>
+
+    Closes `hours` from now when given, else on 2030-01-01; any field can be
+    overridden.
+    """
+    end = ((datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat() if hours is not None
+           else "2030-01-01T00:00:00Z")
+    market = {"id": str(i), "slug": f"market-{i}", "question": f"Question {i}?", "category": None,
+              "endDate": end, "fpmmLive": True, "active": True, "closed": False,
+              "outcomes": '["Yes", "No"]', "outcomePrices": '["0.5", "0.5"]',
+              "clobTokenIds": f'["y{i}", "n{i}"]'}
+    market.update(overrides)
+    return market
+
+
+def market_record(i, hours=None, **overrides):
+    """gamma_market normalized into a dashboard record"""
+    return normalize_market(gamma_market(i, hours, **overrides))
+
+
+class StubClob(ClobAPIClient):
+    """
+    ClobAPIClient that never touches the network: serves stub books and
+    records every upstream /books call (chunking is the real client's)
+    """
+
+    def __init__(self, books=None, down=()):
+        """
+        Args:
+            books: token_id -> book; by default every token gets book(token_id)
+            down: Token ids whose /books requests fail
+        """
+        super().__init__()
+        self.books = books
+        self.down = set(down)
+        self.calls = []
+
+    def get_order_books(self, token_ids):
+        self.calls.append(list(token_ids))
+        if self.down & set(token_ids):
+            raise ConnectionError("upstream unavailable")
+        if self.books is None:
+            return [book(t) for t in token_ids]
+        return [self.books[t] for t in token_ids if t in self.books]
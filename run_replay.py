@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script to record Gamma/CLOB traffic to fixtures, or replay them offline
+
+Record (proxy to the real APIs):
+    python run_replay.py record fixtures/session.ndjson.gz --port 8700
+Replay:
+    python run_replay.py replay fixtures/session.ndjson.gz --port 8700 \\
+        --latency lognormal:80:0.6 --speed 2 --error-rate 0.01
+
+Then point the clients at the server:
+    POLYMARKET_GAMMA_URL=http://127.0.0.1:8700/gamma
+    POLYMARKET_CLOB_URL=http://127.0.0.1:8700/clob
+"""
+import argparse
+
+from src.api.replay import create_record_app, create_replay_app
+from src.core.fixtures import FixtureSet, FixtureWriter
+
+UPSTREAMS = {
+    "gamma": "https://gamma-api.polymarket.com",
+    "clob": "https://clob.polymarket.com",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="proxy to the real APIs and record fixtures")
+    record.add_argument("fixture", help="fixture file to append to (.ndjson.gz)")
+    record.add_argument("--gamma-url", default=UPSTREAMS["gamma"])
+    record.add_argument("--clob-url", default=UPSTREAMS["clob"])
+
+    replay = sub.add_parser("replay", help="serve recorded fixtures")
+    replay.add_argument("fixtures", nargs="+", help="fixture files")
+    replay.add_argument("--latency", default="recorded",
+                        help="recorded | none | fixed:MS | uniform:LO:HI | lognormal:MEDIAN:SIGMA")
+    replay.add_argument("--speed", type=float, default=1.0, help="divides every delay")
+    replay.add_argument("--error-rate", type=float, default=0.0)
+    replay.add_argument("--error-status", type=int, default=503)
+    replay.add_argument("--seed", type=int, default=0)
+    replay.add_argument("--exact", action="store_true", help="require exact query/body matches")
+
+    for p in (record, replay):
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        with FixtureWriter(args.fixture) as writer:
+            app = create_record_app({"gamma": args.gamma_url, "clob": args.clob_url}, writer)
+            app.run(host=args.host, port=args.port, threaded=True)
+            print(f"recorded {writer.count} exchanges to {args.fixture}")
+    else:
+        fixtures = FixtureSet.load(args.fixtures)
+        print(f"replaying {len(fixtures)} exchanges ({', '.join(fixtures.upstreams())})")
+        app = create_replay_app(fixtures, latency=args.latency, speed=args.speed,
+                                error_rate=args.error_rate, error_status=args.error_status,
+                                seed=args.seed, exact=args.exact)
+        app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Command line entry point: python -m src <command>
+
+    python -m src export -o candidates.parquet --quotes
+    python -m src export -o all.ndjson --all --page-size 500 --concurrency 8
+"""
+import argparse
+import json
+import sys
+import time
+
+from src.core.export import EXPORT_COLUMNS, FORMATS, QUOTE_COLUMNS, open_writer, run_export
+
+
+def export(args):
+    from src.clients.gamma import iter_market_pages
+
+    columns = EXPORT_COLUMNS + (QUOTE_COLUMNS if args.quotes else [])
+    clob_client = None
+    if args.quotes:
+        from src.clients.clob import ClobAPIClient
+        clob_client = ClobAPIClient(args.clob_url)
+
+    started = time.perf_counter()
+    pages = iter_market_pages(page_size=args.page_size, concurrency=args.concurrency,
+                              max_markets=args.max_markets, base_url=args.gamma_url)
+    with open_writer(args.output, columns, args.format) as writer:
+        stats = run_export(pages, writer, candidates_only=not args.all, clob_client=clob_client,
+                           quote_chunk_size=args.quote_chunk_size, quote_workers=args.concurrency)
+    summary = dict(stats.to_dict(), output=args.output, seconds=round(time.perf_counter() - started, 2))
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src", description="Polymarket market tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", help="export candidate markets (and quotes) without the dashboard")
+    p.add_argument("-o", "--output", required=True, help="output file, or - for stdout (csv/ndjson)")
+    p.add_argument("--format", choices=FORMATS, help="defaults to the output file extension")
+    p.add_argument("--all", action="store_true", help="export every market, not only candidates")
+    p.add_argument("--page-size", type=int, default=500, help="markets per Gamma request (the upstream may cap it lower)")
+    p.add_argument("--concurrency", type=int, default=4, help="Gamma pages / CLOB batches in flight")
+    p.add_argument("--max-markets", type=int, help="stop after this many markets")
+    p.add_argument("--quotes", action="store_true", help="add best bid/ask from batched CLOB /books calls")
+    p.add_argument("--quote-chunk-size", type=int, default=100, help="tokens per CLOB /books request")
+    p.add_argument("--gamma-url", help="Gamma base URL (default POLYMARKET_GAMMA_URL or the public API)")
+    p.add_argument("--clob-url", help="CLOB base URL (default POLYMARKET_CLOB_URL or the public API)")
+    p.set_defaults(func=export)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "page_size", 1) < 1 or getattr(args, "concurrency", 1) < 1:
+        parser.error("--page-size and --concurrency must be positive")
+    try:
+        return args.func(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+from datetime import datetime
+import math
+
+from flask import jsonify, request
+
+from src.api.markets import find_market
+from src.core.alerts import CLOSES_WITHIN, RULE_KINDS
+from src.core.snapshot import SnapshotError
+
+
+def _parse_end_ts(end_date):
+    try:
+        return datetime.fromisoformat(end_date.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _feed_snapshot_changes(engine):
+    """Snapshot listener: push changed YES/NO prices into the alert engine"""
+    def listener(snapshot, log):
+        if not log.rows:
+            return
+        columns = ["yes_token_id", "no_token_id", "yes_price", "no_price"]
+        for row in snapshot.to_records(columns, log.rows):
+            for token_key, price_key in (("yes_token_id", "yes_price"), ("no_token_id", "no_price")):
+                if row[token_key] and row[price_key] is not None:
+                    engine.on_quote(row[token_key], price=row[price_key])
+        engine.advance()
+    return listener
+
+
+def register_alert_routes(app, engine, holder=None, clock=None):
+    """
+    Register alert subscription endpoints
+
+    Args:
+        app: Flask app
+        engine: AlertEngine evaluating the rules
+        holder: Optional SnapshotHolder, used to resolve market ids to tokens and
+            end dates, and whose snapshot changes are fed to the engine
+        clock: Optional AlertClock, started with the first closes_within rule so
+            those fire without waiting for a request
+    """
+    if holder is not None:
+        holder.listeners.append(_feed_snapshot_changes(engine))
+
+    def _market(market_id):
+        """Look a market up in the current snapshot; None if unavailable"""
+        if holder is None:
+            return None
+        try:
+            snapshot = holder.get()
+        except (FileNotFoundError, SnapshotError):
+            return None
+        row = find_market(snapshot, market_id)
+        if row is None:
+            return None
+        return snapshot.to_records(["yes_token_id", "no_token_id", "endDate"], [row])[0]
+
+    @app.route('/alerts', methods=['POST'])
+    def create_alert():
+        """POST /alerts - Register a rule
+        body: {"kind": ..., "threshold": ..., "token_id" | "market_id" [+ "outcome"], "user": ...}"""
+        body = request.get_json(silent=True) or {}
+        kind = body.get("kind")
+        if kind not in RULE_KINDS:
+            return jsonify({"error": f"kind must be one of {', '.join(RULE_KINDS)}"}), 400
+        try:
+            threshold = float(body.get("threshold"))
+        except (TypeError, ValueError):
+            return jsonify({"error": "threshold must be a number"}), 400
+        if not math.isfinite(threshold):
+            return jsonify({"error": "threshold must be a finite number"}), 400
+
+        token_id = body.get("token_id")
+        market_id = body.get("market_id")
+        end_ts = _parse_end_ts(body["end_date"]) if body.get("end_date") else None
+        market = _market(market_id) if market_id and (end_ts is None or not token_id) else None
+
+        if kind == CLOSES_WITHIN:
+            if end_ts is None and market is not None:
+                end_ts = _parse_end_ts(market["endDate"])
+            if end_ts is None:
+                return jsonify({"error": "end_date or a known market_id is required"}), 400
+        elif not token_id:
+            outcome = (body.get("outcome") or "YES").upper()
+            if market is None or outcome not in ("YES", "NO"):
+                return jsonify({"error": "token_id, or a known market_id and outcome YES/NO, is required"}), 400
+            token_id = market["yes_token_id" if outcome == "YES" else "no_token_id"]
+
+        rule = engine.add_rule(kind, threshold, token_id=token_id, market_id=market_id,
+                               end_ts=end_ts, user=body.get("user"))
+        engine.advance()
+        if kind == CLOSES_WITHIN and clock is not None:
+            clock.start()
+        return jsonify(rule.to_dict()), 201
+
+    @app.route('/alerts', methods=['GET'])
+    def list_alerts():
+        """GET /alerts?user=... - Active rules"""
+        engine.advance()
+        return jsonify({"rules": [r.to_dict() for r in engine.rules_for(request.args.get("user"))]}), 200
+
+    @app.route('/alerts/<int:rule_id>', methods=['DELETE'])
+    def delete_alert(rule_id):
+        """DELETE /alerts/<id> - Unregister a rule"""
+        if not engine.remove_rule(rule_id):
+            return jsonify({"error": "rule not found"}), 404
+        return jsonify({"deleted": rule_id}), 200
+
+    @app.route('/alerts/fired', methods=['GET'])
+    def fired_alerts():
+        """GET /alerts/fired?since=<epoch seconds> - Recently fired alerts"""
+        engine.advance()
+        try:
+            since = float(request.args.get("since", 0))
+        except ValueError:
+            return jsonify({"error": "since must be a number"}), 400
+        alerts = [a.to_dict() for a in list(engine.fired) if a.fired_at > since]
+        return jsonify({"alerts": alerts}), 200
+
+    @app.route('/alerts/quotes', methods=['POST'])
+    def push_quotes():
+        """POST /alerts/quotes - Evaluate quote updates
+        body: {"updates": [{"token_id": ..., "bid": ..., "ask": ..., "price": ...}]}"""
+        body = request.get_json(silent=True) or {}
+        updates = body.get("updates")
+        if not updates or not isinstance(updates, list):
+            return jsonify({"error": "updates must be a non-empty list"}), 400
+        if not all(isinstance(update, dict) for update in updates):
+            return jsonify({"error": "each update must be an object"}), 400
+        # Validate every update before applying any
+        quotes = []
+        for update in updates:
+            if not update.get("token_id"):
+                continue
+            try:
+                values = {k: float(update[k]) for k in ("bid", "ask", "price") if update.get(k) is not None}
+            except (TypeError, ValueError):
+                return jsonify({"error": "bid/ask/price must be numbers"}), 400
+            if not all(math.isfinite(v) for v in values.values()):
+                return jsonify({"error": "bid/ask/price must be finite numbers"}), 400
+            quotes.append((update["token_id"], values))
+        fired = []
+        for token_id, values in quotes:
+            fired += engine.on_quote(token_id, **values)
+        fired += engine.advance()
+        return jsonify({"fired": [a.to_dict() for a in fired]}), 200
@@ -1,53 +1,109 @@
-#!/usr/bin/env python3
-"""
-Test script to verify CLOB API endpoints are working properly
-"""
-import requests
-import time
-from threading import Thread
-from api import create_app
-
-# Start the Flask app in a separate thread for testing
-app = create_app()
-server_thread = None
-
-def start_server():
-    app.run(debug=False, host='0.0.0.0', port=5001)
-
-def test_clob_endpoints():
-    """Test the CLOB API endpoints"""
-    # Wait a moment for the server to start
-    time.sleep(2)
-    
-    base_url = "http://localhost:5001"
-    
-    # Test health endpoint
-    try:
-        response = requests.get(f"{base_url}/health")
-        print(f"Health check: {response.status_code}, {response.json()}")
-    except Exception as e:
-        print(f"Health check failed: {e}")
-    
-    # Test /book endpoint (should return error since no token_id provided)
-    try:
-        response = requests.get(f"{base_url}/book")
-        print(f"Book endpoint (no token_id): {response.status_code}, {response.json()}")
-    except Exception as e:
-        print(f"Book endpoint test failed: {e}")
-    
-    # Test /prices endpoint (should return error since no body provided)
+from dataclasses import asdict, is_dataclass
+
+from flask import jsonify, request
+
+
+def _to_json(obj):
+    """Convert py_clob_client dataclasses (e.g. OrderBookSummary) to plain dicts"""
+    if is_dataclass(obj):
+        return asdict(obj)
+    if isinstance(obj, list):
+        return [_to_json(item) for item in obj]
+    return obj
+
+
+def _price_value(raw):
+    """Extract a float price from a CLOB price response ({"price": "0.5"})"""
+    if isinstance(raw, dict):
+        raw = raw.get("price")
     try:
-        response = requests.post(f"{base_url}/prices", json={})
-        print(f"Prices endpoint (empty body): {response.status_code}, {response.json()}")
-    except Exception as e:
-        print(f"Prices endpoint test failed: {e}")
-
-if __name__ == "__main__":
-    # Start server in background thread
-    server_thread = Thread(target=start_server, daemon=True)
-    server_thread.start()
-    
-    # Run tests
-    test_clob_endpoints()
-    
-    print("Test completed. Server should still be running on another thread.")
+        return float(raw) if raw is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def register_clob_routes(app, clob_client):
+    """Register the CLOB endpoints on a Flask app"""
+
+    @app.route('/book', methods=['GET'])
+    def get_book():
+        """GET /book?token_id=... - Order book summary for a token"""
+        token_id = request.args.get("token_id")
+        if not token_id:
+            return jsonify({"error": "token_id is required"}), 400
+        try:
+            return jsonify(_to_json(clob_client.get_order_book(token_id))), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 502
+
+    @app.route('/books', methods=['POST'])
+    def get_books():
+        """POST /books - Batch order books, body: {"token_ids": [...]}"""
+        body = request.get_json(silent=True) or {}
+        token_ids = body.get("token_ids")
+        if not token_ids or not isinstance(token_ids, list):
+            return jsonify({"error": "token_ids must be a non-empty list"}), 400
+        try:
+            return jsonify({"results": _to_json(clob_client.get_order_books(token_ids))}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 502
+
+    @app.route('/prices', methods=['POST'])
+    def get_prices():
+        """POST /prices - Batch best bid/ask, body: {"requests": [{"token_id": ..., "side": ...}]}"""
+        body = request.get_json(silent=True) or {}
+        requests_data = body.get("requests")
+        if not requests_data or not isinstance(requests_data, list):
+            return jsonify({"error": "requests must be a non-empty list"}), 400
+
+        # Valid pairs go upstream in chunked batch requests, not one call per pair
+        results = []
+        valid = []
+        for req in requests_data:
+            token_id = req.get("token_id") if isinstance(req, dict) else None
+            side = (req.get("side") or "").upper() if isinstance(req, dict) else ""
+            if not token_id or side not in ("BUY", "SELL"):
+                results.append({"token_id": token_id, "side": side, "error": "invalid request"})
+                continue
+            results.append(None)
+            valid.append({"token_id": token_id, "side": side})
+        prices = iter(clob_client.get_prices(valid) if valid else [])
+        results = [result if result is not None else next(prices) for result in results]
+        return jsonify({"results": results}), 200
+
+    @app.route('/price', methods=['GET'])
+    def get_price():
+        """GET /price?token_id=...&side=BUY/SELL - Single token price"""
+        token_id = request.args.get("token_id")
+        side = (request.args.get("side") or "").upper()
+        if not token_id or side not in ("BUY", "SELL"):
+            return jsonify({"error": "token_id and side (BUY/SELL) are required"}), 400
+        price = _price_value(clob_client.get_price(token_id, side=side))
+        return jsonify({"token_id": token_id, "side": side, "price": price}), 200
+
+    @app.route('/midpoint', methods=['GET'])
+    def get_midpoint():
+        """GET /midpoint?token_id=... - Midpoint price"""
+        token_id = request.args.get("token_id")
+        if not token_id:
+            return jsonify({"error": "token_id is required"}), 400
+        raw = clob_client.get_midpoint(token_id)
+        mid = raw.get("mid") if isinstance(raw, dict) else raw
+        try:
+            mid = float(mid) if mid is not None else None
+        except (TypeError, ValueError):
+            mid = None
+        return jsonify({"token_id": token_id, "mid": mid}), 200
+
+    @app.route('/best_bid_ask', methods=['GET'])
+    def get_best_bid_ask():
+        """GET /best_bid_ask?token_id=... - Both bid and ask for a token"""
+        token_id = request.args.get("token_id")
+        if not token_id:
+            return jsonify({"error": "token_id is required"}), 400
+        bid_ask = clob_client.get_best_bid_ask(token_id)
+        return jsonify({
+            "token_id": token_id,
+            "bid": _price_value(bid_ask.get("bid")),
+            "ask": _price_value(bid_ask.get("ask")),
+        }), 200
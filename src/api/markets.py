@@ -0,0 +1,143 @@
+from collections import deque
+import os
+import threading
+
+import numpy as np
+from flask import jsonify, request
+
+from src.core.diff import diff_snapshots
+from src.core.profiling import span
+from src.core.snapshot import Snapshot, SnapshotError
+
+DEFAULT_COLUMNS = ["id", "category", "question", "endDate", "hours_to_close",
+                   "yes_price", "no_price", "slug"]
+
+
+# Markets whose YES price moved more than this are reported as price moves
+PRICE_MOVE_THRESHOLD = 0.05
+# Change logs kept for /markets/changes
+MAX_CHANGE_LOGS = 100
+
+
+class SnapshotHolder:
+    """Keeps a snapshot mapped, reopens it when the file is replaced and
+    records what changed between consecutive versions"""
+
+    def __init__(self, path, price_threshold=PRICE_MOVE_THRESHOLD):
+        self.path = path
+        self.price_threshold = price_threshold
+        self.changes = deque(maxlen=MAX_CHANGE_LOGS)
+        # Called as listener(new_snapshot, change_log) after each reload,
+        # outside the snapshot lock and in reload order
+        self.listeners = []
+        self.seq = 0
+        self._snapshot = None
+        self._mtime = None
+        self._pending = deque()  # (snapshot, change_log) not yet passed to listeners
+        self._lock = threading.Lock()
+        self._listener_lock = threading.Lock()
+
+    def get(self):
+        reloaded = False
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns
+            if self._snapshot is None or mtime != self._mtime:
+                previous = self._snapshot
+                # The old map is left to GC; in-flight requests may still read it
+                self._snapshot = Snapshot(self.path)
+                self._mtime = mtime
+                if previous is not None:
+                    self._record_changes(previous, self._snapshot)
+                    reloaded = True
+            snapshot = self._snapshot
+        if reloaded:
+            # Readers of an unchanged snapshot never wait on slow listeners
+            self._run_listeners()
+        return snapshot
+
+    def _record_changes(self, old, new):
+        log = diff_snapshots(old, new, price_threshold=self.price_threshold)
+        self.seq += 1
+        entry = log.to_dict()
+        entry.pop("rows")
+        entry["seq"] = self.seq
+        entry["created_at"] = new.created_at
+        # Only the added/changed rows are materialized for consumers
+        entry["markets"] = new.to_records(DEFAULT_COLUMNS, np.array(log.rows, dtype=np.int64))
+        self.changes.append(entry)
+        if self.listeners:
+            self._pending.append((new, log))
+
+    def _run_listeners(self):
+        with self._listener_lock:
+            while self._pending:
+                snapshot, log = self._pending.popleft()
+                for listener in self.listeners:
+                    listener(snapshot, log)
+
+
+def find_market(snapshot, market_id):
+    """Row position of a market id in a snapshot, or None"""
+    dictionary = snapshot.dictionary("id")
+    matches = np.flatnonzero(dictionary[:-1] == market_id)
+    if not len(matches):
+        return None
+    rows = np.flatnonzero(snapshot.codes("id") == matches[0])
+    return int(rows[0]) if len(rows) else None
+
+
+def register_market_routes(app, snapshot_path):
+    """Register market table endpoints served from a snapshot file; returns the SnapshotHolder"""
+    holder = SnapshotHolder(snapshot_path)
+
+    @app.route('/markets', methods=['GET'])
+    def get_markets():
+        """GET /markets?columns=a,b&offset=0&limit=100 - Rows from the market snapshot"""
+        try:
+            with span("snapshot.open"):
+                snapshot = holder.get()
+        except FileNotFoundError:
+            return jsonify({"error": "market snapshot not available"}), 503
+        except SnapshotError as e:
+            return jsonify({"error": str(e)}), 500
+
+        columns = request.args.get("columns")
+        columns = columns.split(",") if columns else DEFAULT_COLUMNS
+        unknown = [c for c in columns if c not in snapshot.columns]
+        if unknown:
+            return jsonify({"error": f"unknown columns: {', '.join(unknown)}"}), 400
+
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = int(request.args.get("limit", 100))
+        except ValueError:
+            return jsonify({"error": "offset and limit must be integers"}), 400
+        rows = slice(max(offset, 0), max(offset, 0) + max(limit, 0))
+
+        with span("snapshot.to_records", columns=len(columns)):
+            markets = snapshot.to_records(columns, rows)
+        return jsonify({
+            "total": len(snapshot),
+            "created_at": snapshot.created_at,
+            "seq": holder.seq,
+            "markets": markets,
+        }), 200
+
+    @app.route('/markets/changes', methods=['GET'])
+    def get_market_changes():
+        """GET /markets/changes?since=<seq> - Change logs between snapshot versions after seq"""
+        try:
+            holder.get()
+        except FileNotFoundError:
+            return jsonify({"error": "market snapshot not available"}), 503
+        except SnapshotError as e:
+            return jsonify({"error": str(e)}), 500
+
+        try:
+            since = int(request.args.get("since", 0))
+        except ValueError:
+            return jsonify({"error": "since must be an integer"}), 400
+        changes = [entry for entry in holder.changes if entry["seq"] > since]
+        return jsonify({"seq": holder.seq, "changes": changes}), 200
+
+    return holder
@@ -0,0 +1,48 @@
+import math
+
+from flask import jsonify, request
+
+from src.core.pricing import SIDES, Position, mark_positions
+
+# Upper bound on positions per request
+MAX_POSITIONS = 50000
+
+
+def register_pricing_routes(app, clob_client):
+    """
+    Register the batch position valuation endpoint
+
+    Args:
+        app: Flask app
+        clob_client: ClobAPIClient used to fetch the order books
+    """
+
+    @app.route('/positions/value', methods=['POST'])
+    def value_positions():
+        """POST /positions/value - Mark, executable VWAP and slippage for many positions
+        body: {"positions": [{"token_id": ..., "side": "BUY"|"SELL", "size": ...}]}"""
+        body = request.get_json(silent=True) or {}
+        raw = body.get("positions")
+        if not raw or not isinstance(raw, list):
+            return jsonify({"error": "positions must be a non-empty list"}), 400
+        if len(raw) > MAX_POSITIONS:
+            return jsonify({"error": f"at most {MAX_POSITIONS} positions per request"}), 400
+
+        positions = []
+        for i, item in enumerate(raw):
+            if not isinstance(item, dict) or not item.get("token_id"):
+                return jsonify({"error": f"positions[{i}]: token_id is required"}), 400
+            side = str(item.get("side", "")).upper()
+            if side not in SIDES:
+                return jsonify({"error": f"positions[{i}]: side must be BUY or SELL"}), 400
+            try:
+                size = float(item.get("size"))
+            except (TypeError, ValueError):
+                return jsonify({"error": f"positions[{i}]: size must be a number"}), 400
+            if not math.isfinite(size) or size < 0:
+                return jsonify({"error": f"positions[{i}]: size must be finite and non-negative"}), 400
+            positions.append(Position(str(item["token_id"]), side, size))
+
+        values = mark_positions(clob_client, positions)
+        failed = list(dict.fromkeys(v.token_id for v in values if v.error))
+        return jsonify({"results": [v.to_dict() for v in values], "failed_token_ids": failed}), 200
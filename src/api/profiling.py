@@ -0,0 +1,70 @@
+from flask import g, jsonify, request
+
+from src.core.profiling import DEFAULT_THRESHOLD_MS, Trace, TraceStore, env_enabled
+
+PROFILE_HEADER = "X-Profile"
+
+
+def register_profiling(app, store=None, threshold_ms=DEFAULT_THRESHOLD_MS):
+    """
+    Trace requests that ask for it (X-Profile: 1) or all of them when
+    POLYMARKET_PROFILE=1, and expose the stored traces
+
+    Traced responses carry X-Trace-Id and a Server-Timing total; cProfile
+    output is kept for requests slower than threshold_ms.
+
+    Args:
+        app: Flask app
+        store: TraceStore (defaults to POLYMARKET_PROFILE_DIR)
+        threshold_ms: Latency above which cProfile output is kept
+
+    Returns:
+        The TraceStore
+    """
+    store = store or TraceStore()
+    trace_all = env_enabled()
+
+    @app.before_request
+    def start_trace():
+        if not (trace_all or request.headers.get(PROFILE_HEADER)) or request.path.startswith("/profiles"):
+            return
+        if trace_all or request.headers[PROFILE_HEADER].lower() in ("1", "true"):
+            g.trace = Trace(f"{request.method} {request.path}", threshold_ms=threshold_ms,
+                            query=request.query_string.decode(errors="replace")).start()
+
+    @app.after_request
+    def finish_trace(response):
+        trace = g.pop("trace", None)
+        if trace is not None:
+            trace.finish(status=response.status_code)
+            store.save(trace)
+            response.headers["X-Trace-Id"] = trace.id
+            response.headers["Server-Timing"] = f"total;dur={trace.duration_ms}"
+        return response
+
+    @app.teardown_request
+    def abandon_trace(exc):
+        # Unhandled exceptions skip after_request
+        trace = g.pop("trace", None) if exc is not None else None
+        if trace is not None:
+            trace.finish(status=500, error=type(exc).__name__ if exc else None)
+            store.save(trace)
+
+    @app.route('/profiles', methods=['GET'])
+    def list_profiles():
+        """GET /profiles?limit=50 - Newest stored traces"""
+        try:
+            limit = int(request.args.get("limit", 50))
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        return jsonify({"traces": store.list(limit)}), 200
+
+    @app.route('/profiles/<trace_id>', methods=['GET'])
+    def get_profile(trace_id):
+        """GET /profiles/<id> - Span tree (and cProfile output when slow) of one trace"""
+        trace = store.load(trace_id)
+        if trace is None:
+            return jsonify({"error": "trace not found"}), 404
+        return jsonify(trace), 200
+
+    return store
@@ -0,0 +1,203 @@
+"""
+Record and replay Gamma/CLOB traffic.
+
+``create_record_app`` is a pass-through proxy: point a client at
+``http://host:port/<upstream>`` and every request is forwarded to the real
+API and written to a fixture file along with its latency.
+``create_replay_app`` serves those fixtures back under the same URLs with a
+configurable latency model, speed factor and injected error rate, so
+benchmarks and load tests run offline and deterministically.
+"""
+import random
+import threading
+import time
+
+import requests
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+from src.core.fixtures import Exchange, canonical_body, canonical_query
+
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+# Request headers forwarded upstream when recording
+FORWARD_HEADERS = ("Content-Type", "Accept")
+
+
+class LatencyModel:
+    """
+    Delay applied to each replayed response
+
+    Specs:
+        recorded              latency measured when the exchange was recorded
+        none                  no delay
+        fixed:MS              constant delay
+        uniform:LO:HI         uniform between LO and HI ms
+        lognormal:MEDIAN:SIGMA  lognormal around MEDIAN ms (long tail)
+
+    Every delay is divided by speed (2.0 replays twice as fast).
+    """
+
+    def __init__(self, spec="recorded", speed=1.0, seed=0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        kind, *args = spec.split(":")
+        expected = {"recorded": 0, "none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(args) != expected[kind]:
+            raise ValueError(f"invalid latency spec: {spec!r}")
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        self.speed = speed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, exchange=None):
+        """Delay in seconds for one response"""
+        if self.kind == "none":
+            return 0.0
+        if self.kind == "recorded":
+            ms = exchange.latency_ms if exchange is not None else 0.0
+        elif self.kind == "fixed":
+            ms = self.args[0]
+        else:
+            with self._lock:
+                if self.kind == "uniform":
+                    ms = self._rng.uniform(*self.args)
+                else:
+                    median, sigma = self.args
+                    ms = median * self._rng.lognormvariate(0.0, sigma)
+        return ms / 1000 / self.speed
+
+
+class ReplayStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0  # injected failures
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def to_dict(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def _request_parts():
+    return canonical_query(request.args.items(multi=True)), canonical_body(request.get_data())
+
+
+def create_record_app(upstreams, writer, timeout=30):
+    """
+    Create the recording proxy
+
+    Args:
+        upstreams: Mapping of upstream name to base URL,
+            e.g. {"gamma": "https://gamma-api.polymarket.com"}
+        writer: FixtureWriter the exchanges are appended to
+        timeout: Upstream request timeout (seconds)
+
+    Returns:
+        Flask app
+    """
+    app = Flask(__name__)
+    session = requests.Session()
+
+    @app.route('/<upstream>/<path:path>', methods=METHODS)
+    def record(upstream, path):
+        base_url = upstreams.get(upstream)
+        if base_url is None:
+            return jsonify({"error": f"unknown upstream: {upstream}"}), 404
+        query, body = _request_parts()
+        headers = {h: request.headers[h] for h in FORWARD_HEADERS if h in request.headers}
+        started = time.perf_counter()
+        try:
+            resp = session.request(request.method, f"{base_url.rstrip('/')}/{path}",
+                                   params=list(request.args.items(multi=True)),
+                                   data=request.get_data() or None, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            return jsonify({"error": f"upstream request failed: {e}"}), 502
+        latency_ms = (time.perf_counter() - started) * 1000
+        content_type = resp.headers.get("Content-Type", "application/json")
+        writer.write(Exchange(upstream, request.method, path, query, body,
+                              resp.status_code, content_type, resp.text, round(latency_ms, 3)))
+        return Response(resp.text, status=resp.status_code, content_type=content_type)
+
+    return app
+
+
+def create_replay_app(fixtures, latency="recorded", speed=1.0, error_rate=0.0,
+                      error_status=503, seed=0, exact=False):
+    """
+    Create the replay stub server
+
+    Args:
+        fixtures: FixtureSet to serve
+        latency: LatencyModel spec (see LatencyModel)
+        speed: Divides every delay
+        error_rate: Fraction of requests answered with error_status instead
+        error_status: Status code of injected failures
+        seed: Seed for latency sampling and error injection
+        exact: Require query and body to match a recording exactly
+
+    Returns:
+        Flask app; its ReplayStats are in app.extensions["replay"]
+    """
+    if not 0.0 <= error_rate <= 1.0:
+        raise ValueError("error_rate must be between 0 and 1")
+    app = Flask(__name__)
+    model = LatencyModel(latency, speed, seed)
+    stats = ReplayStats()
+    app.extensions["replay"] = stats
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    @app.route('/_replay/stats', methods=['GET'])
+    def replay_stats():
+        return jsonify(stats.to_dict()), 200
+
+    @app.route('/<upstream>/<path:path>', methods=METHODS)
+    def replay(upstream, path):
+        query, body = _request_parts()
+        exchange = fixtures.match(upstream, request.method, path, query, body, exact=exact)
+        with rng_lock:
+            fail = error_rate > 0 and rng.random() < error_rate
+        delay = model.sample(exchange)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            stats.count("errors")
+            return jsonify({"error": "injected failure"}), error_status
+        if exchange is None:
+            stats.count("misses")
+            return jsonify({"error": f"no recording for {request.method} /{upstream}/{path}"}), 404
+        stats.count("hits")
+        return Response(exchange.response, status=exchange.status, content_type=exchange.content_type)
+
+    return app
+
+
+class ServerThread:
+    """Serve a WSGI app from a background thread (port 0 picks a free port)"""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.server = make_server(host, port, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
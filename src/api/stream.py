@@ -0,0 +1,67 @@
+import json
+import math
+import time
+
+from flask import Response, jsonify, request, stream_with_context
+
+# Bounds for the per-client throttle (seconds between batches)
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 60.0
+# Comment line sent when nothing changed, keeps proxies from closing the stream
+HEARTBEAT_SECONDS = 15.0
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def quote_events(sub, heartbeat=HEARTBEAT_SECONDS, max_seconds=None):
+    """Generate SSE frames for a subscription until the client goes away"""
+    started = time.monotonic()
+    try:
+        yield _sse("subscribed", {"token_ids": sorted(sub.token_ids), "interval": sub.min_interval})
+        while max_seconds is None or time.monotonic() - started < max_seconds:
+            batch = sub.next_batch(timeout=heartbeat)
+            if batch:
+                yield _sse("quotes", {"quotes": [q.to_dict() for q in batch],
+                                      "coalesced": sub.coalesced})
+            elif sub.closed:
+                break
+            else:
+                yield ": heartbeat\n\n"
+    finally:
+        # Runs when the client disconnects and the WSGI server closes the generator
+        sub.close()
+
+
+def register_stream_routes(app, hub, feed=None):
+    """
+    Register the live quote stream endpoint
+
+    Args:
+        app: Flask app
+        hub: QuoteHub fanning quotes out to subscribers
+        feed: Optional upstream feed with start(); started on the first subscription
+    """
+
+    @app.route('/stream/quotes', methods=['GET'])
+    def stream_quotes():
+        """GET /stream/quotes?token_ids=a,b&interval=0.5 - Server-Sent Events of bid/ask/mid updates"""
+        token_ids = [t for t in (request.args.get("token_ids") or "").split(",") if t]
+        try:
+            interval = float(request.args.get("interval", 0.5))
+        except ValueError:
+            return jsonify({"error": "interval must be a number"}), 400
+        if not math.isfinite(interval):
+            # max()/min() pass NaN through, and it would never come due
+            return jsonify({"error": "interval must be a finite number"}), 400
+        interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        try:
+            sub = hub.subscribe(token_ids, min_interval=interval)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if feed is not None:
+            feed.start()
+
+        return Response(stream_with_context(quote_events(sub)), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,15 +1,43 @@
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import BookParams
+
+from src.core.profiling import in_context, traced
+
+# Point at a local replay server with POLYMARKET_CLOB_URL (see run_replay.py)
+CLOB_BASE_URL = os.environ.get("POLYMARKET_CLOB_URL", "https://clob.polymarket.com")
+
+
+class BookBatch(list):
+    """Order books from a chunked fetch, plus the token ids whose chunk failed"""
+
+    def __init__(self, books=(), failed=()):
+        super().__init__(books)
+        self.failed = list(failed)
 
 
 class ClobAPIClient:
     """Client for interacting with Polymarket CLOB API"""
     
-    def __init__(self, base_url: str = "https://clob.polymarket.com"):
-        self.client = ClobClient(base_url)
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = (base_url or CLOB_BASE_URL).rstrip("/")
+        self._client = None
     
+    @property
+    def client(self):
+        """
+        The underlying py_clob_client ClobClient, created on first use
+        
+        py_clob_client pulls in web3/eth signing libraries that take most of a
+        second to import, so processes that never talk to the CLOB (API
+        workers serving snapshots, CLI jobs, pool children) skip that cost.
+        """
+        if self._client is None:
+            from py_clob_client.client import ClobClient
+            self._client = ClobClient(self.base_url)
+        return self._client
+    
+    @traced("clob.get_order_book")
     def get_order_book(self, token_id: str) -> Dict[str, Any]:
         """
         Get order book for a specific token
@@ -22,6 +50,7 @@ class ClobAPIClient:
         """
         return self.client.get_order_book(token_id)
     
+    @traced("clob.get_order_books")
     def get_order_books(self, token_ids: List[str]) -> List[Dict[str, Any]]:
         """
         Get order books for multiple tokens
@@ -32,9 +61,77 @@ class ClobAPIClient:
         Returns:
             List of order book data
         """
+        from py_clob_client.clob_types import BookParams
         book_params = [BookParams(token_id=token_id) for token_id in token_ids]
         return self.client.get_order_books(book_params)
     
+    @traced("clob.get_order_books_chunked")
+    def get_order_books_chunked(self, token_ids: List[str], chunk_size: int = 100,
+                                max_workers: int = 8) -> BookBatch:
+        """
+        Get order books for many tokens, split into concurrent batch requests
+        
+        Args:
+            token_ids: Token IDs (duplicates are fetched once)
+            chunk_size: Tokens per upstream /books request
+            max_workers: Number of requests in flight at once
+            
+        Returns:
+            BookBatch (a list of order books); books of chunks that failed are
+            left out and their token ids listed in its failed attribute
+        """
+        token_ids = list(dict.fromkeys(token_ids))
+        chunks = [token_ids[i:i + chunk_size] for i in range(0, len(token_ids), chunk_size)]
+        failed = []
+        
+        def fetch(chunk):
+            try:
+                return self.get_order_books(chunk)
+            except Exception:
+                failed.extend(chunk)  # list.extend is atomic: safe from pool threads
+                return []
+        
+        if len(chunks) <= 1:
+            results = [fetch(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                results = list(pool.map(in_context(fetch), chunks))
+        return BookBatch((book for books in results for book in books), failed=failed)
+    
+    @traced("clob.get_prices")
+    def get_prices(self, requests_data: List[Dict[str, str]], chunk_size: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get prices for many token/side pairs through the upstream batch endpoint
+        
+        Args:
+            requests_data: List of {"token_id": ..., "side": "BUY"/"SELL"}
+            chunk_size: Pairs per upstream request
+            
+        Returns:
+            List of {"token_id", "side", "price"} in input order (price None if unavailable)
+        """
+        from py_clob_client.clob_types import BookParams
+        prices = {}
+        for i in range(0, len(requests_data), chunk_size):
+            chunk = requests_data[i:i + chunk_size]
+            params = [BookParams(token_id=req["token_id"], side=req["side"]) for req in chunk]
+            try:
+                # Response shape: {token_id: {"BUY": "0.5", "SELL": "0.49"}}
+                prices.update(self.client.get_prices(params) or {})
+            except Exception:
+                continue
+        
+        results = []
+        for req in requests_data:
+            price = (prices.get(req["token_id"]) or {}).get(req["side"])
+            try:
+                price = float(price) if price is not None else None
+            except (TypeError, ValueError):
+                price = None
+            results.append({"token_id": req["token_id"], "side": req["side"], "price": price})
+        return results
+    
+    @traced("clob.get_midpoint")
     def get_midpoint(self, token_id: str) -> Optional[float]:
         """
         Get midpoint price for a token
@@ -50,6 +147,7 @@ class ClobAPIClient:
         except:
             return None
     
+    @traced("clob.get_price")
     def get_price(self, token_id: str, side: str) -> Optional[float]:
         """
         Get price for a token on a specific side (BUY/SELL)
@@ -66,6 +164,7 @@ class ClobAPIClient:
         except:
             return None
     
+    @traced("clob.get_best_bid_ask")
     def get_best_bid_ask(self, token_id: str) -> Dict[str, Optional[float]]:
         """
         Get both best bid and ask prices for a token
@@ -1,18 +1,81 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
 import requests
 
-GAMMA_MARKETS_URL = "https://gamma-api.polymarket.com/markets"
+from src.core.profiling import traced
+
+# Point at a local replay server with POLYMARKET_GAMMA_URL (see run_replay.py)
+GAMMA_BASE_URL = os.environ.get("POLYMARKET_GAMMA_URL", "https://gamma-api.polymarket.com")
+GAMMA_MARKETS_URL = f"{GAMMA_BASE_URL}/markets"
 
-def fetch_markets(limit=None, offset=None):
-    """Fetch markets with optional pagination."""
+@traced("gamma.fetch_markets")
+def fetch_markets(limit=None, offset=None, base_url=None):
+    """Fetch markets with optional pagination. base_url overrides the Gamma host."""
     params = {}
     if limit is not None:
         params["limit"] = limit
     if offset is not None:
         params["offset"] = offset
     
-    resp = requests.get(GAMMA_MARKETS_URL, params=params)
+    url = f"{base_url.rstrip('/')}/markets" if base_url else GAMMA_MARKETS_URL
+    resp = requests.get(url, params=params)
     resp.raise_for_status()
     data = resp.json()
     if isinstance(data, list):
         return data
     return []
+
+def iter_market_pages(page_size=500, concurrency=4, max_markets=None, base_url=None, retries=2):
+    """
+    Walk the whole Gamma catalog page by page
+
+    Up to `concurrency` pages are requested ahead and pages are yielded in
+    offset order, so memory stays bounded by concurrency * page_size markets
+    however large the catalog is. The upstream may cap limit below page_size,
+    so the first page's length sets the offset step, and iteration stops at
+    the first page shorter than that (an empty one at the latest).
+
+    Args:
+        page_size: Markets per request
+        concurrency: Pages in flight at once
+        max_markets: Stop after this many markets
+        base_url: Override the Gamma host
+        retries: Extra attempts per page on request errors
+
+    Yields:
+        Lists of raw market dicts
+    """
+    def fetch(offset):
+        for attempt in range(retries + 1):
+            try:
+                return fetch_markets(limit=page_size, offset=offset, base_url=base_url)
+            except requests.RequestException:
+                if attempt == retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    remaining = max_markets
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        page = fetch(0)
+        step = min(len(page), page_size)
+        if not step:
+            return
+        offsets = iter(range(step, max_markets if max_markets is not None else 2 ** 62, step))
+        pending = deque(pool.submit(fetch, o) for _, o in zip(range(concurrency), offsets))
+        while True:
+            if remaining is not None:
+                page = page[:remaining]
+                remaining -= len(page)
+            if page:
+                yield page
+            if len(page) < step or remaining == 0 or not pending:
+                for future in pending:
+                    future.cancel()
+                return
+            offset = next(offsets, None)
+            if offset is not None:
+                pending.append(pool.submit(fetch, offset))
+            page = pending.popleft().result()
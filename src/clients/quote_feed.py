@@ -0,0 +1,64 @@
+import threading
+import time
+
+from src.core.book import book_field, best_bid_ask
+
+
+class PollingQuoteFeed:
+    """Upstream feed for a QuoteHub: polls CLOB order books for the subscribed tokens"""
+    
+    def __init__(self, clob_client, hub, interval: float = 1.0, batch_size: int = 100):
+        self.clob_client = clob_client
+        self.hub = hub
+        self.interval = interval
+        self.batch_size = batch_size
+        self.upstream_calls = 0
+        self.polls = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def poll_once(self) -> int:
+        """
+        Fetch books for every subscribed token (batched) and publish best bid/ask
+        
+        Returns:
+            Number of quotes that reached at least one subscriber
+        """
+        tokens = self.hub.tokens()
+        self.polls += 1
+        delivered = 0
+        for i in range(0, len(tokens), self.batch_size):
+            chunk = tokens[i:i + self.batch_size]
+            try:
+                books = self.clob_client.get_order_books(chunk)
+                self.upstream_calls += 1
+            except Exception:
+                self.errors += 1
+                continue
+            for token_id, book in zip(chunk, books):
+                token_id = book_field(book, "asset_id") or token_id
+                bid, ask = best_bid_ask(book)
+                if self.hub.publish(token_id, bid, ask):
+                    delivered += 1
+        return delivered
+    
+    def run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            if self.hub.tokens():
+                self.poll_once()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+    
+    def start(self):
+        """Start polling in a daemon thread (idempotent, safe to call per request)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, daemon=True)
+                self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,29 @@
+import requests
+
+
+class WebhookNotifier:
+    """Alert notifier that POSTs each fired alert as JSON to a webhook URL"""
+    
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.failures = 0
+    
+    def notify(self, alert) -> bool:
+        """
+        Deliver one alert
+        
+        Args:
+            alert: Fired Alert (see src.core.alerts)
+            
+        Returns:
+            True if the webhook accepted it, False otherwise
+        """
+        try:
+            resp = self.session.post(self.url, json=alert.to_dict(), timeout=self.timeout)
+            resp.raise_for_status()
+            return True
+        except requests.RequestException:
+            self.failures += 1
+            return False
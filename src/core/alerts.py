@@ -0,0 +1,378 @@
+"""
+Threshold alerting on quotes and time-to-close.
+
+Rules are stored in per-token sorted threshold indexes, so a quote update
+only looks at the thresholds between the previous and the new value (two
+bisects plus the rules that actually fire). Time-to-close rules sit in a
+heap ordered by the moment they become due.
+
+Rules are one-shot: once fired they are removed from the indexes. A rule
+whose condition already holds for the token's last quote fires when added.
+"""
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import asdict, dataclass, field
+import heapq
+import itertools
+import math
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+PRICE_ABOVE = "price_above"
+PRICE_BELOW = "price_below"
+SPREAD_ABOVE = "spread_above"
+CLOSES_WITHIN = "closes_within"
+RULE_KINDS = (PRICE_ABOVE, PRICE_BELOW, SPREAD_ABOVE, CLOSES_WITHIN)
+
+# Fired alerts kept in memory for GET /alerts/fired
+MAX_FIRED = 1000
+# Alerts waiting for delivery in a QueuedNotifier before new ones are dropped
+MAX_PENDING_NOTIFICATIONS = 10000
+
+
+@dataclass
+class AlertRule:
+    id: int
+    kind: str
+    threshold: float  # price, spread, or hours before close
+    token_id: Optional[str] = None
+    market_id: Optional[str] = None
+    end_ts: Optional[float] = None  # market close (epoch seconds), closes_within only
+    user: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class Alert:
+    rule: AlertRule
+    value: float  # price/spread that crossed, or hours left
+    fired_at: float
+
+    def to_dict(self):
+        return {"rule": self.rule.to_dict(), "value": self.value, "fired_at": self.fired_at}
+
+
+class _ThresholdIndex:
+    """Thresholds kept sorted, with the ids of their rules alongside"""
+
+    __slots__ = ("keys", "ids")
+
+    def __init__(self):
+        self.keys = []
+        self.ids = []
+
+    def add(self, threshold, rule_id):
+        i = bisect_right(self.keys, threshold)
+        self.keys.insert(i, threshold)
+        self.ids.insert(i, rule_id)
+
+    def remove(self, threshold, rule_id):
+        i = bisect_left(self.keys, threshold)
+        while i < len(self.keys) and self.keys[i] == threshold:
+            if self.ids[i] == rule_id:
+                del self.keys[i]
+                del self.ids[i]
+                return
+            i += 1
+
+    def pop_range(self, lo, hi, include_lo, include_hi):
+        """Remove and return rule ids with lo < t < hi (bounds optionally inclusive)"""
+        start = bisect_left(self.keys, lo) if include_lo else bisect_right(self.keys, lo)
+        end = bisect_right(self.keys, hi) if include_hi else bisect_left(self.keys, hi)
+        if start >= end:
+            return []
+        fired = self.ids[start:end]
+        del self.keys[start:end]
+        del self.ids[start:end]
+        return fired
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class _TokenState:
+    __slots__ = ("above", "below", "spread", "price", "spread_value")
+
+    def __init__(self):
+        self.above = _ThresholdIndex()
+        self.below = _ThresholdIndex()
+        self.spread = _ThresholdIndex()
+        self.price = None
+        self.spread_value = None
+
+
+def quote_price(bid=None, ask=None, price=None):
+    """Price a quote update is evaluated at: explicit price, else mid, else the one side"""
+    if price is not None:
+        return price
+    if bid is not None and ask is not None:
+        return (bid + ask) / 2
+    return bid if bid is not None else ask
+
+
+class AlertEngine:
+    """Registry of alert rules evaluated against quote updates and the clock"""
+
+    def __init__(self, notifier=None):
+        self.notifier = notifier
+        self.rules: Dict[int, AlertRule] = {}
+        self.fired = deque(maxlen=MAX_FIRED)
+        self._tokens: Dict[str, _TokenState] = {}
+        self._last: Dict[str, tuple] = {}  # (price, spread) of quoted tokens without rules
+        self._due = []  # heap of (due_ts, rule_id) for closes_within rules
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_rule(self, kind, threshold, token_id=None, market_id=None, end_ts=None, user=None):
+        """
+        Register a rule
+
+        Args:
+            kind: One of RULE_KINDS
+            threshold: Price (0-1) or spread for quote rules, hours for closes_within
+            token_id: Token the quote rules watch
+            market_id: Market a closes_within rule watches
+            end_ts: Market close time as epoch seconds (closes_within)
+            user: Optional owner, used to list rules
+
+        Returns:
+            The AlertRule (already fired if its condition held for the last quote)
+        """
+        if kind not in RULE_KINDS:
+            raise ValueError(f"unknown rule kind: {kind}")
+        threshold = float(threshold)
+        if not math.isfinite(threshold):
+            raise ValueError("threshold must be finite")
+        if kind == CLOSES_WITHIN:
+            if end_ts is None:
+                raise ValueError("closes_within rules need the market end time")
+        elif not token_id:
+            raise ValueError(f"{kind} rules need a token_id")
+
+        alerts = []
+        with self._lock:
+            rule = AlertRule(next(self._ids), kind, threshold, token_id=token_id,
+                             market_id=market_id, end_ts=end_ts, user=user)
+            self.rules[rule.id] = rule
+            if kind == CLOSES_WITHIN:
+                heapq.heappush(self._due, (end_ts - threshold * 3600, rule.id))
+            else:
+                # Later quotes only fire on a cross, so check the last one now
+                value = self._holds(rule)
+                if value is not None:
+                    alerts = self._fire([(rule.id, value)], None)
+                else:
+                    self._index(rule).add(threshold, rule.id)
+        self._notify(alerts)
+        return rule
+
+    def remove_rule(self, rule_id):
+        """Unregister a rule; returns False if it does not exist (or already fired)"""
+        with self._lock:
+            rule = self.rules.pop(rule_id, None)
+            if rule is None:
+                return False
+            # closes_within entries are dropped lazily when they come due
+            if rule.kind != CLOSES_WITHIN:
+                self._index(rule).remove(rule.threshold, rule.id)
+            return True
+
+    def rules_for(self, user=None):
+        with self._lock:
+            return [r for r in self.rules.values() if user is None or r.user == user]
+
+    def _holds(self, rule):
+        """The token's last price/spread if it already satisfies the rule, else None"""
+        state = self._state(rule.token_id)
+        if rule.kind == PRICE_ABOVE:
+            value = state.price
+            holds = value is not None and value >= rule.threshold
+        elif rule.kind == PRICE_BELOW:
+            value = state.price
+            holds = value is not None and value <= rule.threshold
+        else:
+            value = state.spread_value
+            holds = value is not None and value > rule.threshold
+        return value if holds else None
+
+    def _state(self, token_id):
+        state = self._tokens.get(token_id)
+        if state is None:
+            state = self._tokens[token_id] = _TokenState()
+            state.price, state.spread_value = self._last.pop(token_id, (None, None))
+        return state
+
+    def _index(self, rule):
+        state = self._state(rule.token_id)
+        if rule.kind == PRICE_ABOVE:
+            return state.above
+        if rule.kind == PRICE_BELOW:
+            return state.below
+        return state.spread
+
+    def on_quote(self, token_id, bid=None, ask=None, price=None, now=None):
+        """
+        Evaluate a quote update for one token
+
+        Only rules whose threshold lies between the previous and the new value
+        are touched. The first quote of a token fires every rule whose
+        condition already holds.
+
+        Returns:
+            List of fired Alerts
+        """
+        if any(v is not None and not math.isfinite(v) for v in (bid, ask, price)):
+            raise ValueError("bid/ask/price must be finite")
+        price = quote_price(bid, ask, price)
+        spread = ask - bid if bid is not None and ask is not None else None
+        fired = []
+        with self._lock:
+            state = self._tokens.get(token_id)
+            if state is None:
+                # No rules for this token: nothing can fire, but keep the quote
+                # so that rules added later can be checked against it
+                last_price, last_spread = self._last.get(token_id, (None, None))
+                self._last[token_id] = (last_price if price is None else price,
+                                        last_spread if spread is None else spread)
+                return fired
+            if price is not None:
+                prev = state.price
+                if prev is None or price > prev:
+                    lo = -math.inf if prev is None else prev
+                    fired += [(rid, price) for rid in state.above.pop_range(lo, price, False, True)]
+                if prev is None or price < prev:
+                    hi = math.inf if prev is None else prev
+                    fired += [(rid, price) for rid in state.below.pop_range(price, hi, True, False)]
+                state.price = price
+            if spread is not None:
+                prev = state.spread_value
+                if prev is None or spread > prev:
+                    lo = -math.inf if prev is None else prev
+                    fired += [(rid, spread) for rid in state.spread.pop_range(lo, spread, True, False)]
+                state.spread_value = spread
+            alerts = self._fire(fired, now)
+        self._notify(alerts)
+        return alerts
+
+    def advance(self, now=None):
+        """Fire closes_within rules that have come due; returns fired Alerts"""
+        now = time.time() if now is None else now
+        fired = []
+        with self._lock:
+            while self._due and self._due[0][0] <= now:
+                _, rule_id = heapq.heappop(self._due)
+                rule = self.rules.get(rule_id)
+                if rule is not None:
+                    fired.append((rule_id, round((rule.end_ts - now) / 3600, 2)))
+            alerts = self._fire(fired, now)
+        self._notify(alerts)
+        return alerts
+
+    def _fire(self, fired, now):
+        now = time.time() if now is None else now
+        alerts = []
+        for rule_id, value in fired:
+            rule = self.rules.pop(rule_id, None)
+            if rule is not None:
+                alert = Alert(rule, value, now)
+                self.fired.append(alert)
+                alerts.append(alert)
+        return alerts
+
+    def _notify(self, alerts):
+        # Outside the lock: a slow notifier must not block quote evaluation
+        if self.notifier is not None:
+            for alert in alerts:
+                self.notifier.notify(alert)
+
+    def __len__(self):
+        return len(self.rules)
+
+
+class QueuedNotifier:
+    """
+    Wraps a notifier so that notify() only enqueues: a worker thread does the
+    delivery, keeping slow webhooks off the request and quote paths
+    """
+
+    def __init__(self, notifier, maxsize: int = MAX_PENDING_NOTIFICATIONS):
+        self.notifier = notifier
+        self.delivered = 0
+        self.failures = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def notify(self, alert) -> bool:
+        """Enqueue an alert for delivery; False if the queue is full and it was dropped"""
+        self.start()
+        try:
+            self._queue.put_nowait(alert)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def run(self):
+        while True:
+            alert = self._queue.get()
+            try:
+                if self.notifier.notify(alert):
+                    self.delivered += 1
+                else:
+                    self.failures += 1
+            except Exception:
+                self.failures += 1
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, daemon=True)
+                self._thread.start()
+        return self
+
+    def join(self):
+        """Block until every queued alert has been handed to the notifier"""
+        self._queue.join()
+
+
+class AlertClock:
+    """Calls engine.advance() every interval seconds, so closes_within rules
+    fire on time even when no requests arrive"""
+
+    def __init__(self, engine, interval: float = 30.0):
+        self.engine = engine
+        self.interval = interval
+        self.ticks = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.ticks += 1
+            try:
+                self.engine.advance()
+            except Exception:
+                self.errors += 1
+
+    def start(self):
+        """Start ticking in a daemon thread (idempotent, safe to call per request)"""
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
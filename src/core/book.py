@@ -0,0 +1,33 @@
+def book_field(obj, key):
+    """Read a field from a py_clob_client dataclass or a plain JSON dict"""
+    if isinstance(obj, dict):
+        return obj.get(key)
+    return getattr(obj, key, None)
+
+
+def book_levels(book, side):
+    """
+    Price levels of one side of an order book as (price, size) floats
+    
+    Args:
+        book: OrderBookSummary or the equivalent JSON dict
+        side: "bids" or "asks"
+        
+    Returns:
+        List of (price, size), best price first
+    """
+    levels = []
+    for level in book_field(book, side) or []:
+        try:
+            levels.append((float(book_field(level, "price")), float(book_field(level, "size"))))
+        except (TypeError, ValueError):
+            continue
+    levels.sort(key=lambda level: level[0], reverse=(side == "bids"))
+    return levels
+
+
+def best_bid_ask(book):
+    """Best bid and ask of an order book (None for an empty side)"""
+    bids = book_levels(book, "bids")
+    asks = book_levels(book, "asks")
+    return (bids[0][0] if bids else None), (asks[0][0] if asks else None)
@@ -0,0 +1,226 @@
+"""
+Change detection between two market snapshots.
+
+Both sides are columnar: either a ``Snapshot`` or a mapping of column name to
+array (see ``columns_from_records``). Rows are matched on a key column, each
+row is reduced to a 64-bit hash over the compared columns, and only rows whose
+hash differs are compared column by column.
+
+Snapshots carry stable row hashes written alongside the data, so diffing two
+of them never decodes unchanged rows. Column mappings are hashed on the fly
+with Python's ``hash``; the two schemes differ, so diffing a Snapshot against
+a mapping sends every row to the column-by-column check (correct, just slower).
+"""
+from dataclasses import dataclass, field
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.core.snapshot import MARKET_COLUMNS, ROW_HASH_COLUMNS, Snapshot, combine_hashes
+
+DIFF_COLUMNS = ROW_HASH_COLUMNS
+
+
+@dataclass
+class RowChange:
+    id: str
+    fields: Dict[str, Any]  # column -> (old, new)
+
+
+@dataclass
+class ChangeLog:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[RowChange] = field(default_factory=list)
+    price_moves: List[str] = field(default_factory=list)
+    closed: List[str] = field(default_factory=list)
+    entered_candidates: List[str] = field(default_factory=list)
+    left_candidates: List[str] = field(default_factory=list)
+    # Row positions in the new snapshot of added and changed markets, i.e. the
+    # only rows consumers need to (re)load
+    rows: List[int] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self):
+        return {
+            "added": self.added,
+            "removed": self.removed,
+            "changed": [{"id": c.id, "fields": {k: list(v) for k, v in c.fields.items()}}
+                        for c in self.changed],
+            "price_moves": self.price_moves,
+            "closed": self.closed,
+            "entered_candidates": self.entered_candidates,
+            "left_candidates": self.left_candidates,
+            "rows": self.rows,
+        }
+
+
+def columns_from_records(records, names=None):
+    """Turn a list of market dicts into the column mapping diff_snapshots accepts"""
+    names = names or list(MARKET_COLUMNS)
+    columns = {}
+    for name in names:
+        values = [r.get(name) for r in records]
+        if MARKET_COLUMNS.get(name) == "f8":
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype="f8")
+        elif MARKET_COLUMNS.get(name) == "bool":
+            columns[name] = np.array([bool(v) for v in values], dtype=bool)
+        else:
+            arr = np.empty(len(values), dtype=object)
+            for i, value in enumerate(values):  # element-wise so lists stay objects
+                arr[i] = value
+            columns[name] = arr
+    return columns
+
+
+def _column(source, name, rows=None):
+    if isinstance(source, Snapshot):
+        return source.column(name, rows)
+    values = np.asarray(source[name])
+    return values if rows is None else values[rows]
+
+
+def _hash_object(value):
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    return hash(value)
+
+
+def _column_hash(values):
+    """64-bit hash of every value in an in-memory column"""
+    if values.dtype.kind == "f":
+        values = np.where(np.isnan(values), np.nan, values)  # canonical NaN
+        return values.astype("f8").view(np.uint64)
+    if values.dtype.kind in "biu":
+        return values.astype(np.uint64)
+    return np.fromiter((_hash_object(v) for v in values),
+                       dtype=np.int64, count=len(values)).view(np.uint64)
+
+
+def row_hashes(source, columns=None):
+    """One uint64 per row over the compared columns"""
+    columns = columns or DIFF_COLUMNS
+    if isinstance(source, Snapshot):
+        return source.row_hashes(columns)
+    return combine_hashes(_column_hash(_column(source, name)) for name in columns)
+
+
+def _truthy(source, name):
+    """Boolean mask of non-empty values in an object column"""
+    if isinstance(source, Snapshot):
+        offsets, _ = source.string_block(name)
+        return np.append(np.diff(offsets) > 0, False)[source.codes(name)]
+    return np.array([bool(v) for v in _column(source, name)], dtype=bool)
+
+
+def _is_pair(values):
+    return np.fromiter((isinstance(v, list) and len(v) == 2 for v in values), dtype=bool, count=len(values))
+
+
+def candidate_mask(source):
+    """Vectorized version of the dashboard candidate rule (48h / active / order book /
+    YES/NO tokens, see filters.is_candidate_record)"""
+    hours = _column(source, "hours_to_close")
+    with np.errstate(invalid="ignore"):
+        in_window = (hours > 0) & (hours <= 48)
+    mask = (_column(source, "enableOrderBook").astype(bool)
+            & _column(source, "active").astype(bool)
+            & ~_column(source, "closed").astype(bool)
+            & in_window
+            & _truthy(source, "yes_token_id")
+            & _truthy(source, "no_token_id"))
+    # clob_token_ids must parse to a YES/NO pair; only decoded for rows still in
+    rows = np.flatnonzero(mask)
+    mask[rows] = _is_pair(_column(source, "clob_token_ids", rows))
+    return mask
+
+
+def _plain(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def diff_snapshots(old, new, key="id", columns=None, price_threshold: Optional[float] = None,
+                   with_candidates=True):
+    """
+    Compare two market snapshots
+
+    Args:
+        old: Previous snapshot (Snapshot or column mapping)
+        new: Current snapshot
+        key: Column rows are matched on (market id by default)
+        columns: Columns to compare (defaults to DIFF_COLUMNS)
+        price_threshold: Report markets whose YES price moved by more than this
+        with_candidates: Also report markets entering/leaving the candidate set
+
+    Returns:
+        ChangeLog
+    """
+    columns = columns or DIFF_COLUMNS
+    old_keys = _column(old, key)
+    new_keys = _column(new, key)
+
+    old_pos = {k: i for i, k in enumerate(old_keys.tolist())}
+    new_to_old = np.fromiter((old_pos.pop(k, -1) for k in new_keys.tolist()),
+                             dtype=np.int64, count=len(new_keys))
+    matched_new = np.flatnonzero(new_to_old >= 0)
+    matched_old = new_to_old[matched_new]
+
+    log = ChangeLog()
+    touched = np.flatnonzero(new_to_old < 0)
+    log.added = new_keys[touched].tolist()
+    log.removed = list(old_pos)  # whatever was not popped has no match in new
+
+    old_hash = row_hashes(old, columns)
+    new_hash = row_hashes(new, columns)
+    differs = old_hash[matched_old] != new_hash[matched_new]
+    changed_new = matched_new[differs]
+    changed_old = matched_old[differs]
+
+    if len(changed_new):
+        fields = {}
+        for name in columns:
+            a = _column(old, name, changed_old)
+            b = _column(new, name, changed_new)
+            if a.dtype.kind == "f":
+                ne = ~((a == b) | (np.isnan(a) & np.isnan(b)))
+            else:
+                ne = np.array([x != y for x, y in zip(a, b)], dtype=bool) \
+                    if a.dtype == object else a != b
+            for j in np.flatnonzero(ne):
+                fields.setdefault(j, {})[name] = (_plain(a[j]), _plain(b[j]))
+        changed_keys = new_keys[changed_new]
+        log.changed = [RowChange(changed_keys[j], fields[j]) for j in sorted(fields)]
+        touched = np.concatenate([touched, changed_new[sorted(fields)]])
+
+        if "closed" in columns:
+            now_closed = _column(new, "closed", changed_new).astype(bool) & \
+                ~_column(old, "closed", changed_old).astype(bool)
+            log.closed = changed_keys[now_closed].tolist()
+
+    log.rows = np.sort(touched).tolist()
+
+    if price_threshold is not None:
+        old_price = _column(old, "yes_price", matched_old)
+        new_price = _column(new, "yes_price", matched_new)
+        with np.errstate(invalid="ignore"):
+            moved = np.abs(new_price - old_price) > price_threshold
+        log.price_moves = new_keys[matched_new[moved]].tolist()
+
+    if with_candidates:
+        old_cand = candidate_mask(old)
+        new_cand = candidate_mask(new)
+        was = np.zeros(len(new_keys), dtype=bool)
+        was[matched_new] = old_cand[matched_old]
+        log.entered_candidates = new_keys[new_cand & ~was].tolist()
+        still = np.zeros(len(old_keys), dtype=bool)
+        still[matched_old] = new_cand[matched_new]
+        log.left_candidates = old_keys[old_cand & ~still].tolist()
+
+    return log
@@ -0,0 +1,236 @@
+"""
+Headless export of candidate markets and quotes.
+
+The pipeline is fetch -> parse -> filter -> focus -> (quotes) -> write, run one
+Gamma page at a time: each page is normalized, filtered and written before the
+next one is taken, so memory is bounded by the page size rather than the
+catalog size and no DataFrame is ever built. Writers stream rows to CSV,
+NDJSON or Parquet (one row group per page).
+"""
+import csv
+from dataclasses import asdict, dataclass, field
+import json
+import sys
+from typing import Dict, List, Optional
+
+from src.core.book import best_bid_ask, book_field
+from src.core.filters import is_candidate_record
+from src.core.parse import normalize_market
+from src.core.select_focus import focus_categories
+from src.core.snapshot import MARKET_COLUMNS
+
+EXPORT_COLUMNS = list(MARKET_COLUMNS) + ["is_candidate", "focus"]
+QUOTE_COLUMNS = ["yes_bid", "yes_ask", "no_bid", "no_ask"]
+FORMATS = ("csv", "ndjson", "parquet")
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".parquet": "parquet"}
+
+
+def _kind(name):
+    if name in QUOTE_COLUMNS:
+        return "f8"
+    if name == "is_candidate":
+        return "bool"
+    return MARKET_COLUMNS.get(name, "str")
+
+
+class RowWriter:
+    """Streams dict rows with a fixed column list to a file"""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+
+    def write_rows(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _TextRowWriter(RowWriter):
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        self._file = sys.stdout if path == "-" else open(path, "w", newline="", encoding="utf-8")
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+class CsvRowWriter(_TextRowWriter):
+    """CSV with a header row; JSON columns (token id lists) are written as JSON text"""
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        self._json = {c for c in self.columns if _kind(c) == "json"}
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self._json:
+                row = dict(row, **{c: json.dumps(row.get(c)) for c in self._json})
+            self._writer.writerow(row)
+        self.rows += len(rows)
+
+
+class NdjsonRowWriter(_TextRowWriter):
+    """One JSON object per line"""
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._file.write(json.dumps({c: row.get(c) for c in self.columns}) + "\n")
+        self.rows += len(rows)
+
+
+class ParquetRowWriter(RowWriter):
+    """Parquet via pyarrow (imported on first use), one row group per write_rows call"""
+
+    def __init__(self, path, columns):
+        super().__init__(path, columns)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        types = {"f8": pa.float64(), "bool": pa.bool_(), "str": pa.string(), "json": pa.string()}
+        self._pa = pa
+        self._schema = pa.schema([(c, types[_kind(c)]) for c in self.columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        arrays = {}
+        for c in self.columns:
+            values = [row.get(c) for row in rows]
+            if _kind(c) == "json":
+                values = [None if v is None else json.dumps(v) for v in values]
+            arrays[c] = values
+        self._writer.write_table(self._pa.Table.from_pydict(arrays, schema=self._schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvRowWriter, "ndjson": NdjsonRowWriter, "parquet": ParquetRowWriter}
+
+
+def open_writer(path, columns, fmt=None) -> RowWriter:
+    """
+    Open a row writer, inferring the format from the extension when not given
+
+    Args:
+        path: Output file ("-" for stdout, CSV/NDJSON only)
+        columns: Columns to write, in order
+        fmt: One of FORMATS
+    """
+    if fmt is None:
+        for ext, name in _EXTENSIONS.items():
+            if path.endswith(ext):
+                fmt = name
+                break
+        else:
+            raise ValueError(f"cannot infer the output format of {path!r}; pass one of {', '.join(FORMATS)}")
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if fmt == "parquet" and path == "-":
+        raise ValueError("parquet cannot be written to stdout")
+    return WRITERS[fmt](path, columns)
+
+
+@dataclass
+class ExportStats:
+    pages: int = 0
+    markets: int = 0
+    candidates: int = 0
+    rows: int = 0
+    quoted: int = 0  # rows with at least one quote
+    focus: Dict[str, str] = field(default_factory=dict)  # slot -> market id
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class FocusTracker:
+    """
+    Streaming pick_focus: the first candidate matching each slot wins
+
+    Because picks only depend on rows seen earlier, a row's focus slot is
+    final as soon as the row is seen and can be written out right away.
+    """
+
+    def __init__(self):
+        self.picks: Dict[str, str] = {}
+
+    def assign(self, record) -> Optional[str]:
+        slots = [s for s in sorted(focus_categories(record.get("category"), record.get("question")))
+                 if s not in self.picks]
+        for slot in slots:
+            self.picks[slot] = record.get("id")
+        return ",".join(slots) or None
+
+
+def add_quotes(rows, clob_client, chunk_size=100, max_workers=4):
+    """Fill QUOTE_COLUMNS from one chunked batch of order book requests"""
+    token_ids = [t for row in rows for t in (row.get("yes_token_id"), row.get("no_token_id")) if t]
+    if not token_ids:
+        return 0
+    books = clob_client.get_order_books_chunked(token_ids, chunk_size=chunk_size, max_workers=max_workers)
+    quotes = {book_field(book, "asset_id"): best_bid_ask(book) for book in books}
+    quoted = 0
+    for row in rows:
+        yes = quotes.get(row.get("yes_token_id"))
+        no = quotes.get(row.get("no_token_id"))
+        row["yes_bid"], row["yes_ask"] = yes or (None, None)
+        row["no_bid"], row["no_ask"] = no or (None, None)
+        quoted += bool(yes or no)
+    return quoted
+
+
+def run_export(pages, writer, candidates_only=True, clob_client=None,
+               quote_chunk_size=100, quote_workers=4) -> ExportStats:
+    """
+    Run the export pipeline over raw Gamma pages
+
+    Args:
+        pages: Iterable of raw market lists (see iter_market_pages)
+        writer: RowWriter receiving the rows
+        candidates_only: Drop markets that fail the candidate rule
+        clob_client: When given, rows are enriched with best bid/ask quotes
+        quote_chunk_size: Tokens per upstream /books request
+        quote_workers: Concurrent /books requests
+
+    Returns:
+        ExportStats
+    """
+    stats = ExportStats()
+    focus = FocusTracker()
+    for page in pages:
+        stats.pages += 1
+        stats.markets += len(page)
+        rows: List[dict] = []
+        for market in page:
+            record = normalize_market(market)
+            record["is_candidate"] = is_candidate_record(record)
+            if record["is_candidate"]:
+                stats.candidates += 1
+                record["focus"] = focus.assign(record)
+            elif candidates_only:
+                continue
+            else:
+                record["focus"] = None
+            rows.append(record)
+        if clob_client is not None and rows:
+            stats.quoted += add_quotes(rows, clob_client, quote_chunk_size, quote_workers)
+        writer.write_rows(rows)
+        stats.rows += len(rows)
+    stats.focus = dict(focus.picks)
+    return stats
@@ -14,3 +14,18 @@ def is_candidate(market):
     if not yes_token or not no_token:
         return False
     return True
+
+
+def is_candidate_record(record):
+    """Dashboard candidate rule on a normalized record (see normalize_market)"""
+    if not record.get("enableOrderBook"):
+        return False
+    if not record.get("active") or record.get("closed"):
+        return False
+    hours = record.get("hours_to_close")
+    if hours is None or not (0 < hours <= 48):
+        return False
+    clob_token_ids = record.get("clob_token_ids")
+    if not isinstance(clob_token_ids, list) or len(clob_token_ids) != 2:
+        return False
+    return bool(record.get("yes_token_id") and record.get("no_token_id"))
@@ -0,0 +1,158 @@
+"""
+Recorded HTTP exchanges for offline replay.
+
+A fixture file is gzip-compressed NDJSON, one exchange per line: the request
+(upstream name, method, path, canonical query and body), the response
+(status, content type, body) and the upstream latency measured when it was
+recorded. Files can be appended to across recording sessions; gzip readers
+handle the concatenated members transparently.
+
+Requests are matched on their canonical form, so query parameter order and
+JSON body formatting do not matter. When the same request was recorded
+several times (a polled order book, say), replay walks through the
+recordings in order and wraps around, so changing data replays
+deterministically.
+"""
+from dataclasses import asdict, dataclass, field
+import gzip
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode
+
+
+@dataclass
+class Exchange:
+    upstream: str  # name of the upstream API, e.g. "gamma" or "clob"
+    method: str
+    path: str
+    query: str  # canonical query string
+    body: str  # canonical request body ("" when there is none)
+    status: int
+    content_type: str
+    response: str
+    latency_ms: float
+    recorded_at: float = field(default_factory=time.time)
+
+    @property
+    def key(self):
+        return request_key(self.upstream, self.method, self.path, self.query, self.body)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def canonical_query(query) -> str:
+    """Sorted query string from a raw string or a list of (name, value) pairs"""
+    pairs = parse_qsl(query, keep_blank_values=True) if isinstance(query, str) else list(query)
+    return urlencode(sorted(pairs))
+
+
+def canonical_body(body) -> str:
+    """Request body with JSON re-serialized in a stable form"""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if not body:
+        return ""
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+def request_key(upstream, method, path, query="", body=""):
+    return (upstream, method.upper(), "/" + path.strip("/"), query, body)
+
+
+class FixtureWriter:
+    """Appends exchanges to a fixture file; safe to share between threads"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def write(self, exchange: Exchange):
+        line = json.dumps(exchange.to_dict(), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_exchanges(paths) -> List[Exchange]:
+    """Read every exchange from one or more fixture files, in recording order"""
+    if isinstance(paths, str):
+        paths = [paths]
+    exchanges = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    exchanges.append(Exchange(**json.loads(line)))
+    return exchanges
+
+
+class FixtureSet:
+    """Recorded exchanges indexed for replay"""
+
+    def __init__(self, exchanges: Iterable[Exchange]):
+        self.exchanges = list(exchanges)
+        self._by_key: Dict[tuple, List[Exchange]] = {}
+        self._by_path: Dict[tuple, List[Exchange]] = {}
+        for exchange in self.exchanges:
+            self._by_key.setdefault(exchange.key, []).append(exchange)
+            self._by_path.setdefault(exchange.key[:3], []).append(exchange)
+        self._cursor: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, paths):
+        return cls(load_exchanges(paths))
+
+    def upstreams(self):
+        return sorted({e.upstream for e in self.exchanges})
+
+    def match(self, upstream, method, path, query="", body="", exact=False) -> Optional[Exchange]:
+        """
+        Find the recording for a request
+
+        Args:
+            upstream, method, path: Request target
+            query, body: Canonical query string and body
+            exact: Only accept a recording with the same query and body;
+                otherwise fall back to any recording of the same path
+
+        Returns:
+            The next Exchange for that request, or None
+        """
+        key = request_key(upstream, method, path, query, body)
+        candidates = self._by_key.get(key)
+        if candidates is None and not exact:
+            key = key[:3]
+            candidates = self._by_path.get(key)
+        if not candidates:
+            return None
+        with self._lock:
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+        return candidates[i % len(candidates)]
+
+    def rewind(self):
+        with self._lock:
+            self._cursor.clear()
+
+    def __len__(self):
+        return len(self.exchanges)
@@ -0,0 +1,106 @@
+"""
+Market-level liquidity metrics computed over stacked order books.
+
+Books for every YES/NO token are stacked once into padded level arrays (see
+``stack_books``) and each metric is a handful of NumPy operations over the
+whole set. Parsing the levels while stacking is Python-bound and dominates
+the cost (on par with a per-market loop over the parsed books, see
+benchmarks/bench_liquidity.py), so only the sides the metrics read are
+parsed: both sides of YES books, the asks of NO books.
+
+Metrics, per market:
+    spread      YES best ask - best bid
+    depth_2c    YES shares resting within DEPTH_WINDOW of the mid, both sides
+    imbalance   (bid depth - ask depth) / (bid depth + ask depth) in that window
+    overround   YES best ask + NO best ask - 1: cost above payout of buying both sides
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from src.core.book import book_field
+from src.core.pricing import StackedBooks, stack_books
+
+LIQUIDITY_COLUMNS = ["spread", "depth_2c", "imbalance", "overround"]
+DEPTH_WINDOW = 0.02
+# Price comparisons on decimal tick prices stored as floats
+_EPS = 1e-9
+
+
+def _rows(stacked: StackedBooks, token_ids):
+    rows = np.fromiter((stacked.index.get(t, -1) for t in token_ids), dtype=np.int64, count=len(token_ids))
+    return rows, rows >= 0
+
+
+def _depth(px, sz, rows, known, bound, bids):
+    """Shares per row on levels at or better than bound (price >= bound for bids, <= for asks)"""
+    level_px = px[np.where(known, rows, 0)]
+    level_sz = sz[np.where(known, rows, 0)]
+    with np.errstate(invalid="ignore"):
+        inside = level_px >= bound[:, None] - _EPS if bids else level_px <= bound[:, None] + _EPS
+    depth = np.where(inside, level_sz, 0.0).sum(axis=1)
+    return np.where(known & ~np.isnan(bound), depth, np.nan)
+
+
+def liquidity_metrics(stacked: StackedBooks, yes_token_ids, no_token_ids,
+                      window=DEPTH_WINDOW, no_stacked: StackedBooks = None) -> Dict[str, np.ndarray]:
+    """
+    Compute LIQUIDITY_COLUMNS for markets given by their YES/NO token ids
+
+    Markets whose books are missing (or one-sided, for spread) get NaN. NO
+    books are looked up in no_stacked when given (only their asks are read).
+
+    Returns:
+        Column name -> float array aligned with the token id lists
+    """
+    yes_rows, yes_known = _rows(stacked, yes_token_ids)
+    no_stacked = stacked if no_stacked is None else no_stacked
+    no_rows, no_known = _rows(no_stacked, no_token_ids)
+    best_bid, best_ask = stacked.best_bid, stacked.best_ask
+
+    yes_bid = np.where(yes_known, best_bid[np.where(yes_known, yes_rows, 0)], np.nan)
+    yes_ask = np.where(yes_known, best_ask[np.where(yes_known, yes_rows, 0)], np.nan)
+    no_ask = np.where(no_known, no_stacked.best_ask[np.where(no_known, no_rows, 0)], np.nan)
+
+    spread = yes_ask - yes_bid
+    # Window around the mid; a one-sided book is measured from its best price
+    ref = np.where(np.isnan(yes_bid), yes_ask, np.where(np.isnan(yes_ask), yes_bid, (yes_bid + yes_ask) / 2))
+    bid_depth = _depth(stacked.bid_px, stacked.bid_sz, yes_rows, yes_known, ref - window, bids=True)
+    ask_depth = _depth(stacked.ask_px, stacked.ask_sz, yes_rows, yes_known, ref + window, bids=False)
+    depth = bid_depth + ask_depth
+    with np.errstate(invalid="ignore", divide="ignore"):
+        imbalance = np.where(depth > 0, (bid_depth - ask_depth) / depth, np.nan)
+
+    return {
+        "spread": np.round(spread, 6),
+        "depth_2c": np.round(depth, 6),
+        "imbalance": np.round(imbalance, 6),
+        "overround": np.round(yes_ask + no_ask - 1, 6),
+    }
+
+
+def market_liquidity(clob_client, yes_token_ids, no_token_ids, chunk_size=100,
+                     max_workers=8) -> Dict[str, List]:
+    """
+    Fetch the books of all YES/NO tokens in chunked batches and compute the metrics
+
+    Args:
+        clob_client: ClobAPIClient (anything with get_order_books_chunked)
+        yes_token_ids, no_token_ids: Token ids per market (None/"" for unknown)
+        chunk_size: Tokens per upstream /books request
+        max_workers: Concurrent upstream requests
+
+    Returns:
+        Column name -> list of floats (None where unavailable), aligned with the markets
+    """
+    yes_token_ids = [t or "" for t in yes_token_ids]
+    no_token_ids = [t or "" for t in no_token_ids]
+    token_ids = [t for t in dict.fromkeys(yes_token_ids + no_token_ids) if t]
+    books = clob_client.get_order_books_chunked(token_ids, chunk_size=chunk_size,
+                                                max_workers=max_workers) if token_ids else []
+    yes_set, no_set = set(yes_token_ids), set(no_token_ids)
+    yes_books = [b for b in books if book_field(b, "asset_id") in yes_set]
+    no_books = [b for b in books if book_field(b, "asset_id") in no_set]
+    metrics = liquidity_metrics(stack_books(yes_books), yes_token_ids, no_token_ids,
+                                no_stacked=stack_books(no_books, sides=("asks",)))
+    return {name: [None if np.isnan(v) else float(v) for v in values] for name, values in metrics.items()}
@@ -18,3 +18,8 @@ class MarketRecord:
     no_price: Optional[float]
     invalid_reason: Optional[str]
     clob_token_ids: Optional[List[str]] = None
+    # Order book liquidity (see src/core/liquidity.py), None when not computed
+    spread: Optional[float] = None
+    depth_2c: Optional[float] = None
+    imbalance: Optional[float] = None
+    overround: Optional[float] = None
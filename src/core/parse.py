@@ -1,4 +1,5 @@
 from datetime import datetime, timezone
+import ast
 import json
 
 def hours_to_close(end_date_str):
@@ -84,3 +85,36 @@ def parse_yes_no(market: dict):
             yes_token = no_token = None  # Also reset tokens if there's an error
 
     return yes_price, no_price, yes_token, no_token, invalid_reason
+
+def parse_clob_token_ids(value):
+    """Parse clobTokenIds (JSON string or list) into a list, [] on failure"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except:
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+def normalize_market(m: dict):
+    """Flatten a raw Gamma market into the dashboard's record shape"""
+    yes_price, no_price, yes_token, no_token, invalid_reason = parse_yes_no(m)
+    return {
+        "id": m.get("id"),
+        "slug": m.get("slug"),
+        "question": m.get("question"),
+        "category": m.get("category"),
+        "endDate": m.get("endDate"),
+        "hours_to_close": hours_to_close(m.get("endDate")),
+        "enableOrderBook": m.get("fpmmLive", False),
+        "active": m.get("active", False),
+        "closed": m.get("closed", False),
+        "yes_token_id": yes_token,
+        "no_token_id": no_token,
+        "yes_price": yes_price,
+        "no_price": no_price,
+        "invalid_reason": invalid_reason,
+        "clob_token_ids": parse_clob_token_ids(m.get("clobTokenIds", "[]")),
+    }
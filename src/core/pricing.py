@@ -0,0 +1,215 @@
+"""
+Batch valuation of positions against order book depth.
+
+Books are stacked into padded (tokens x levels) price/size arrays once, and
+every position is filled against its side of the book in one vectorized
+pass: no per-position loops over levels.
+"""
+from dataclasses import asdict, dataclass
+import math
+from operator import itemgetter
+from typing import List, Optional
+
+import numpy as np
+
+from src.core.book import book_field, book_levels
+from src.core.profiling import span
+
+SIDES = ("BUY", "SELL")
+_PRICE = itemgetter("price")
+_SIZE = itemgetter("size")
+# PositionValue.error for tokens whose order book request failed upstream
+BOOK_UNAVAILABLE = "book_unavailable"
+
+
+@dataclass
+class Position:
+    token_id: str
+    side: str  # BUY walks the asks, SELL walks the bids
+    size: float
+
+
+@dataclass
+class PositionValue:
+    token_id: str
+    side: str
+    size: float
+    mark: Optional[float]  # book midpoint (best bid if there are no asks and vice versa)
+    vwap: Optional[float]  # average fill price over the filled size
+    filled: float
+    slippage: Optional[float]  # adverse distance of vwap from mark, in price units
+    error: Optional[str] = None  # set when the token's book could not be fetched
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class StackedBooks:
+    index: dict  # token_id -> row
+    bid_px: np.ndarray  # (tokens, levels), best first, 0 padded
+    bid_sz: np.ndarray
+    ask_px: np.ndarray
+    ask_sz: np.ndarray
+
+    @property
+    def best_bid(self):
+        return np.where(self.bid_sz[:, 0] > 0, self.bid_px[:, 0], np.nan)
+
+    @property
+    def best_ask(self):
+        return np.where(self.ask_sz[:, 0] > 0, self.ask_px[:, 0], np.nan)
+
+
+def _stack(sides):
+    depth = max((len(levels) for levels in sides), default=0) or 1
+    # At least one (empty) row, so lookups of unknown tokens can index row 0
+    px = np.zeros((max(len(sides), 1), depth))
+    sz = np.zeros((max(len(sides), 1), depth))
+    for row, levels in enumerate(sides):
+        if levels:
+            arr = np.asarray(levels, dtype=float)
+            px[row, :len(levels)] = arr[:, 0]
+            sz[row, :len(levels)] = arr[:, 1]
+    return px, sz
+
+
+def _stack_side(books, side):
+    """
+    Padded price/size arrays of one side of every book, best price first
+
+    All level strings are converted by one NumPy call and ordered by one
+    lexsort, instead of float() per value and a Python sort per book; books
+    arrive in either order (the CLOB lists the best level last).
+    """
+    counts = []
+    prices = []
+    sizes = []
+    try:
+        for book in books:
+            levels = book_field(book, side) or []
+            counts.append(len(levels))
+            if levels and isinstance(levels[0], dict):
+                prices += map(_PRICE, levels)
+                sizes += map(_SIZE, levels)
+            else:
+                prices += [book_field(level, "price") for level in levels]
+                sizes += [book_field(level, "size") for level in levels]
+        price = np.array(prices, dtype=float)
+        size = np.array(sizes, dtype=float)
+    except (KeyError, TypeError, ValueError):
+        # Malformed levels: parse book by book, skipping the bad ones
+        return _stack([book_levels(book, side) for book in books])
+
+    counts = np.array(counts, dtype=np.int64)
+    depth = int(counts.max(initial=0)) or 1
+    # At least one (empty) row, so lookups of unknown tokens can index row 0
+    px = np.zeros((max(len(books), 1), depth))
+    sz = np.zeros((max(len(books), 1), depth))
+    if len(price):
+        rows = np.repeat(np.arange(len(books)), counts)
+        order = np.lexsort((-price if side == "bids" else price, rows))
+        cols = np.arange(len(price)) - np.repeat(np.cumsum(counts) - counts, counts)
+        px[rows, cols] = price[order]
+        sz[rows, cols] = size[order]
+    return px, sz
+
+
+def stack_books(books, token_ids=None, sides=("bids", "asks")):
+    """
+    Stack order books into padded level arrays
+
+    Args:
+        books: OrderBookSummary objects or JSON dicts
+        token_ids: Row labels; defaults to each book's asset_id
+        sides: Sides to parse; the others are stacked empty (parsing dominates the cost)
+
+    Returns:
+        StackedBooks
+    """
+    if token_ids is None:
+        token_ids = [book_field(book, "asset_id") for book in books]
+    bid_px, bid_sz = _stack_side(books, "bids") if "bids" in sides else _stack([[]] * len(books))
+    ask_px, ask_sz = _stack_side(books, "asks") if "asks" in sides else _stack([[]] * len(books))
+    return StackedBooks({t: i for i, t in enumerate(token_ids)}, bid_px, bid_sz, ask_px, ask_sz)
+
+
+def _fill(px, sz, rows, size):
+    """Fill each position against its row of levels; returns (filled, notional)"""
+    level_px = px[rows]
+    level_sz = sz[rows]
+    before = np.cumsum(level_sz, axis=1) - level_sz  # size available ahead of each level
+    take = np.clip(size[:, None] - before, 0.0, level_sz)
+    return take.sum(axis=1), (take * level_px).sum(axis=1)
+
+
+def value_positions(stacked, positions) -> List[PositionValue]:
+    """
+    Mark, executable VWAP and slippage for every position
+
+    Positions on tokens missing from the books come back with None prices.
+    """
+    n = len(positions)
+    rows = np.fromiter((stacked.index.get(p.token_id, -1) for p in positions), dtype=np.int64, count=n)
+    size = np.fromiter((p.size for p in positions), dtype=float, count=n)
+    buy = np.fromiter((p.side == "BUY" for p in positions), dtype=bool, count=n)
+    known = rows >= 0
+    safe_rows = np.where(known, rows, 0)
+
+    best_bid = stacked.best_bid[safe_rows]
+    best_ask = stacked.best_ask[safe_rows]
+    mark = np.where(np.isnan(best_bid), best_ask,
+                    np.where(np.isnan(best_ask), best_bid, (best_bid + best_ask) / 2))
+
+    filled = np.zeros(n)
+    notional = np.zeros(n)
+    for is_buy, px, sz in ((True, stacked.ask_px, stacked.ask_sz), (False, stacked.bid_px, stacked.bid_sz)):
+        sel = known & (buy == is_buy)
+        if sel.any():
+            filled[sel], notional[sel] = _fill(px, sz, safe_rows[sel], size[sel])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.where(filled > 0, notional / filled, np.nan)
+    slippage = np.where(buy, vwap - mark, mark - vwap)
+    mark[~known] = np.nan
+
+    def _opt(x):
+        return None if np.isnan(x) else round(float(x), 6)
+
+    return [PositionValue(p.token_id, p.side, p.size, _opt(mark[i]), _opt(vwap[i]),
+                          round(float(filled[i]), 6), _opt(slippage[i]))
+            for i, p in enumerate(positions)]
+
+
+def mark_positions(clob_client, positions, chunk_size=100, max_workers=8) -> List[PositionValue]:
+    """
+    Fetch the books a set of positions needs and value them
+
+    Args:
+        clob_client: ClobAPIClient (anything with get_order_books_chunked)
+        positions: Positions (or (token_id, side, size) tuples)
+        chunk_size: Tokens per upstream /books request
+        max_workers: Concurrent upstream requests
+
+    Returns:
+        List of PositionValue, in input order; positions whose book fetch
+        failed carry error="book_unavailable" rather than looking unknown
+    """
+    positions = [p if isinstance(p, Position) else Position(*p) for p in positions]
+    for p in positions:
+        if p.side not in SIDES:
+            raise ValueError(f"side must be BUY or SELL, got {p.side!r}")
+        if not math.isfinite(p.size) or p.size < 0:
+            raise ValueError("size must be finite and non-negative")
+    token_ids = list(dict.fromkeys(p.token_id for p in positions))  # deduped, order kept
+    books = clob_client.get_order_books_chunked(token_ids, chunk_size=chunk_size, max_workers=max_workers)
+    with span("pricing.stack_books", books=len(books)):
+        stacked = stack_books(books)
+    with span("pricing.value_positions", positions=len(positions)):
+        values = value_positions(stacked, positions)
+    failed = set(getattr(books, "failed", ()))
+    if failed:
+        for value in values:
+            if value.token_id in failed:
+                value.error = BOOK_UNAVAILABLE
+    return values
@@ -0,0 +1,268 @@
+"""
+Opt-in per-request tracing and slow-path profiling.
+
+A trace is a tree of timed spans (upstream calls, parse, filter, DataFrame
+build, render, ...) for one API request or dashboard rerun. Instrumented
+code calls ``span(name)`` or is decorated with ``traced(name)``; when no
+trace is active in the current context both reduce to one ContextVar lookup,
+so instrumentation can stay in hot paths permanently.
+
+When a trace is started with profiling on, cProfile runs alongside it and
+its top functions are kept only if the trace turns out slower than the
+threshold. Finished traces go to a ``TraceStore``, a directory of JSON files
+that keeps the newest ``max_files``.
+
+Environment:
+    POLYMARKET_PROFILE=1              trace every request/rerun
+    POLYMARKET_PROFILE_DIR            trace store directory (default .profiles)
+    POLYMARKET_PROFILE_THRESHOLD_MS   keep cProfile output above this (default 500)
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+from typing import Optional
+
+PROFILE_ENV = "POLYMARKET_PROFILE"
+DEFAULT_DIR = os.environ.get("POLYMARKET_PROFILE_DIR", ".profiles")
+DEFAULT_THRESHOLD_MS = float(os.environ.get("POLYMARKET_PROFILE_THRESHOLD_MS", 500))
+# Functions listed from a kept cProfile run
+PROFILE_TOP = 30
+
+_current = contextvars.ContextVar("polymarket_span", default=None)
+_ids = itertools.count(1)
+_local = threading.local()  # trace started in this thread, see clear()
+
+
+def env_enabled():
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes")
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "duration_ms", "children", "error")
+
+    def __init__(self, name, attrs=None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        self.children = []
+        self.error = None
+
+    def to_dict(self, origin):
+        return {"name": self.name,
+                "start_ms": round((self.start - origin) * 1000, 3),
+                "duration_ms": self.duration_ms,
+                **({"attrs": self.attrs} if self.attrs else {}),
+                **({"error": self.error} if self.error else {}),
+                "children": [c.to_dict(origin) for c in self.children]}
+
+
+class _SpanContext:
+    __slots__ = ("span", "token")
+
+    def __init__(self, name, attrs):
+        self.span = Span(name, attrs)
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is not None:
+            parent.children.append(self.span)  # list.append is atomic: safe from pool threads
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.duration_ms = round((time.perf_counter() - span.start) * 1000, 3)
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        _current.reset(self.token)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, **attrs):
+    """Time a block as a child of the current span; a no-op when not tracing"""
+    if _current.get() is None:
+        return _NO_SPAN
+    return _SpanContext(name, attrs)
+
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with _SpanContext(name, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def in_context(fn):
+    """
+    Wrap fn so that calls from worker threads attach their spans to the
+    caller's current span (thread pools do not inherit context variables)
+    """
+    if _current.get() is None:
+        return fn
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+def tracing():
+    return _current.get() is not None
+
+
+def clear():
+    """Stop a trace left unfinished in this thread, e.g. by a Streamlit run cut short by st.rerun()"""
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace.finish()
+    _current.set(None)
+
+
+class Trace:
+    """A root span plus the optional cProfile run covering it"""
+
+    def __init__(self, name, profile=True, threshold_ms=DEFAULT_THRESHOLD_MS, **attrs):
+        self.id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(_ids)}"
+        self.created_at = time.time()
+        self.root = Span(name, attrs)
+        self.threshold_ms = threshold_ms
+        self.profile_text = None
+        self._profiler = cProfile.Profile() if profile else None
+        self._token = None
+
+    def start(self):
+        _local.trace = self
+        self._token = _current.set(self.root)
+        if self._profiler is not None:
+            try:
+                self._profiler.enable()
+            except ValueError:  # another profiler is already active
+                self._profiler = None
+        self.root.start = time.perf_counter()
+        return self
+
+    def finish(self, **attrs):
+        self.root.duration_ms = round((time.perf_counter() - self.root.start) * 1000, 3)
+        self.root.attrs.update(attrs)
+        if self._profiler is not None:
+            self._profiler.disable()
+            if self.slow:
+                out = io.StringIO()
+                pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+                self.profile_text = out.getvalue()
+            self._profiler = None
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:  # finished from another context
+                _current.set(None)
+            self._token = None
+        if getattr(_local, "trace", None) is self:
+            _local.trace = None
+        return self
+
+    @property
+    def duration_ms(self):
+        return self.root.duration_ms
+
+    @property
+    def slow(self):
+        return self.duration_ms is not None and self.duration_ms >= self.threshold_ms
+
+    def to_dict(self):
+        return {"id": self.id, "created_at": self.created_at, "duration_ms": self.duration_ms,
+                "slow": self.slow, "threshold_ms": self.threshold_ms,
+                "spans": self.root.to_dict(self.root.start), "profile": self.profile_text}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.finish()
+
+
+class TraceStore:
+    """Directory of trace JSON files, newest max_files kept"""
+
+    def __init__(self, directory=DEFAULT_DIR, max_files=200):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def _path(self, trace_id):
+        return os.path.join(self.directory, f"{trace_id}.json")
+
+    def save(self, trace: Trace) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(trace.id)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(trace.to_dict(), f)
+        os.replace(tmp, path)
+        with self._lock:
+            self._rotate()
+        return path
+
+    def _rotate(self):
+        files = sorted((e for e in os.scandir(self.directory) if e.name.endswith(".json")),
+                       key=lambda e: e.stat().st_mtime_ns)
+        for entry in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def list(self, limit=50):
+        """Summaries of the newest traces, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = sorted((e for e in os.scandir(self.directory) if e.name.endswith(".json")),
+                       key=lambda e: e.stat().st_mtime_ns, reverse=True)[:limit]
+        summaries = []
+        for entry in files:
+            trace = self.load(entry.name[:-len(".json")])
+            if trace is not None:
+                summaries.append({k: trace[k] for k in ("id", "created_at", "duration_ms", "slow")}
+                                 | {"name": trace["spans"]["name"], "attrs": trace["spans"].get("attrs", {})})
+        return summaries
+
+    def load(self, trace_id) -> Optional[dict]:
+        if not trace_id or "/" in trace_id or trace_id.startswith("."):
+            return None
+        try:
+            with open(self._path(trace_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+def format_spans(span_dict, indent=0):
+    """Indented text rendering of a span tree (from Trace.to_dict()["spans"])"""
+    lines = [f"{'  ' * indent}{span_dict['name']}: {span_dict['duration_ms']} ms"
+             + (f" [{span_dict['error']}]" if span_dict.get("error") else "")]
+    for child in span_dict["children"]:
+        lines.append(format_spans(child, indent + 1))
+    return "\n".join(lines)
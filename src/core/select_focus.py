@@ -1,28 +1,50 @@
-def pick_focus(candidates):
-    """Select 1 crypto and 1 sports market from candidates."""
-    crypto_keywords = ["crypto", "bitcoin", "ethereum", "btc", "eth", "cryptocurrency"]
-    sports_keywords = ["sport", "football", "basketball", "soccer", "tennis", "baseball", "hockey", "nfl"]
+CRYPTO_KEYWORDS = ["crypto", "bitcoin", "ethereum", "btc", "eth", "cryptocurrency"]
+SPORTS_KEYWORDS = ["sport", "football", "basketball", "soccer", "tennis", "baseball", "hockey", "nfl"]
+
+
+def focus_categories(category, question):
+    """Focus slots ("crypto", "sports") a market's category/question qualifies for"""
+    category_lower = (category or "").lower()
+    question_lower = (question or "").lower()
+    matches = set()
+    if any(k in category_lower or k in question_lower for k in CRYPTO_KEYWORDS):
+        matches.add("crypto")
+    if any(k in category_lower or k in question_lower for k in SPORTS_KEYWORDS):
+        matches.add("sports")
+    return matches
+
+
+def _missing(value):
+    return value is None or value != value  # None or NaN
+
+
+def liquidity_rank(market):
+    """Sort key preferring tight spreads, then deep books; markets without book data last"""
+    spread = getattr(market, "spread", None)
+    depth = getattr(market, "depth_2c", None)
+    return (_missing(spread), 0.0 if _missing(spread) else spread, -(0.0 if _missing(depth) else depth))
+
+
+def pick_focus(candidates, key=None):
+    """
+    Select 1 crypto and 1 sports market from candidates.
     
+    With a key (e.g. liquidity_rank), candidates are ranked by it first, so
+    the most tradable market of each kind wins instead of the first one.
+    """
+    if key is not None:
+        candidates = sorted(candidates, key=key)
     crypto = None
     sports = None
     
     for market in candidates:
-        category_lower = (market.category or "").lower()
-        question_lower = (market.question or "").lower()
+        matches = focus_categories(market.category, market.question)
         
-        # Check if it's a crypto market
-        if crypto is None:
-            for keyword in crypto_keywords:
-                if keyword in category_lower or keyword in question_lower:
-                    crypto = market
-                    break
-        
-        # Check if it's a sports market
-        if sports is None:
-            for keyword in sports_keywords:
-                if keyword in category_lower or keyword in question_lower:
-                    sports = market
-                    break
+        # First crypto and first sports market win
+        if crypto is None and "crypto" in matches:
+            crypto = market
+        if sports is None and "sports" in matches:
+            sports = market
         
         # If we found both, we can stop searching
         if crypto and sports:
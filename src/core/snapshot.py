@@ -0,0 +1,434 @@
+"""
+Versioned on-disk snapshot of the normalized market table.
+
+Layout (all integers little-endian, every block 64-byte aligned):
+
+    MAGIC (8 bytes) | version (u32) | header length (u32) | header JSON | blocks...
+
+The JSON header lists the row count and, for each column, its kind and the
+byte offsets of its blocks:
+
+- ``f8``   one float64 block (None is stored as NaN)
+- ``bool`` one uint8 block
+- ``str``  dictionary encoded: int32 codes (-1 = None), plus the distinct
+           values as uint32 offsets into a UTF-8 blob
+- ``json`` same as ``str``, values are JSON-encoded (used for list columns)
+
+Opening a snapshot maps the file and only touches the blocks of the columns
+that are actually requested, so numeric columns are zero-copy views and a
+string column costs its dictionary plus one gather.
+"""
+from datetime import datetime, timezone
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"PMSNAP\x00\x00"
+SNAPSHOT_VERSION = 1
+ALIGN = 64
+
+# Column kinds of the normalized market table (see parse.normalize_market)
+MARKET_COLUMNS = {
+    "id": "str",
+    "slug": "str",
+    "question": "str",
+    "category": "str",
+    "endDate": "str",
+    "hours_to_close": "f8",
+    "enableOrderBook": "bool",
+    "active": "bool",
+    "closed": "bool",
+    "yes_token_id": "str",
+    "no_token_id": "str",
+    "yes_price": "f8",
+    "no_price": "f8",
+    "invalid_reason": "str",
+    "clob_token_ids": "json",
+}
+
+# Columns covered by the stored per-row hash used for change detection;
+# hours_to_close drifts with the clock, so it would flag every row as changed
+ROW_HASH_COLUMNS = [name for name in MARKET_COLUMNS if name != "hours_to_close"]
+
+_PREFIX = struct.Struct("<8sII")
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_BYTE_PRIME = np.uint64(0x100000001B3)
+
+
+class SnapshotError(ValueError):
+    """Raised when a file is not a readable market snapshot"""
+
+
+def _pad(n):
+    return (-n) % ALIGN
+
+
+def _encode_strings(values, as_json=False):
+    """Dictionary-encode a column into (codes, offsets, blob)"""
+    index = {}
+    codes = np.empty(len(values), dtype="<i4")
+    for i, value in enumerate(values):
+        if value is None:
+            codes[i] = -1
+            continue
+        key = json.dumps(value) if as_json else str(value)
+        code = index.get(key)
+        if code is None:
+            code = index[key] = len(index)
+        codes[i] = code
+    encoded = [key.encode("utf-8") for key in index]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return codes, offsets, b"".join(encoded)
+
+
+def _encode_column(kind, values):
+    """Return the named blocks (name -> bytes-like) for one column"""
+    if kind == "f8":
+        arr = np.array([np.nan if v is None else v for v in values], dtype="<f8")
+        return {"values": arr}
+    if kind == "bool":
+        return {"values": np.array([bool(v) for v in values], dtype="u1")}
+    if kind in ("str", "json"):
+        codes, offsets, blob = _encode_strings(values, as_json=(kind == "json"))
+        return {"codes": codes, "offsets": offsets, "data": blob}
+    raise SnapshotError(f"unknown column kind: {kind}")
+
+
+def _finalize(h):
+    """splitmix64 finalizer, spreads polynomial hashes over all 64 bits"""
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def string_hashes(offsets, data):
+    """
+    Stable 64-bit hash of every entry of a string dictionary block
+
+    Vectorized over the whole blob, so hashing a dictionary never decodes it.
+    The same bytes always hash the same, across processes and files.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    data = np.frombuffer(data, dtype=np.uint8) if isinstance(data, bytes) else data
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    hashes = np.zeros(len(lengths), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        if len(data):
+            # Position of every byte inside its own string, so equal strings
+            # hash equally wherever they sit in the blob
+            local = np.arange(len(data)) - np.repeat(starts, lengths)
+            powers = np.ones(int(lengths.max()), dtype=np.uint64)
+            powers[1:] = np.cumprod(np.full(len(powers) - 1, _BYTE_PRIME, dtype=np.uint64))
+            terms = (data.astype(np.uint64) + np.uint64(1)) * powers[local]
+            nonempty = lengths > 0
+            hashes[nonempty] = np.add.reduceat(terms, starts[nonempty])
+        return _finalize(hashes ^ (lengths.astype(np.uint64) * _MIX))
+
+
+def _column_hashes(kind, blocks):
+    """Stable 64-bit hash of every value of an encoded column"""
+    if kind == "f8":
+        values = np.asarray(blocks["values"], dtype="<f8")
+        values = np.where(np.isnan(values), np.nan, values)  # canonical NaN
+        return values.view(np.uint64)
+    if kind == "bool":
+        return np.asarray(blocks["values"]).astype(np.uint64)
+    # The extra last slot is code -1 (None)
+    hashes = np.append(string_hashes(blocks["offsets"], blocks["data"]), _MIX)
+    return hashes[blocks["codes"]]
+
+
+def combine_hashes(column_hashes):
+    """Fold per-column hashes into one uint64 per row"""
+    result = None
+    with np.errstate(over="ignore"):
+        for h in column_hashes:
+            result = h.copy() if result is None else (result * _MIX) ^ h
+    return result
+
+
+def write_snapshot(records, path, columns=None):
+    """
+    Write normalized market records to a snapshot file
+
+    Args:
+        records: List of dicts as produced by parse.normalize_market
+        path: Destination file; written to a temp file and renamed atomically
+        columns: Optional mapping of column name -> kind (defaults to MARKET_COLUMNS)
+
+    Returns:
+        Number of rows written
+    """
+    columns = columns or MARKET_COLUMNS
+    encoded = {
+        name: _encode_column(kind, [r.get(name) for r in records])
+        for name, kind in columns.items()
+    }
+
+    # Block offsets are relative to the aligned end of the header, so the
+    # header can be serialized before its own length is known.
+    layout = []
+    rel = 0
+    header_cols = []
+    for name, kind in columns.items():
+        blocks = {}
+        for block_name, block in encoded[name].items():
+            size = block.nbytes if isinstance(block, np.ndarray) else len(block)
+            blocks[block_name] = [rel, size]
+            layout.append(block)
+            rel += size + _pad(size)
+        header_cols.append({"name": name, "kind": kind, "blocks": blocks})
+
+    hashed = [name for name in ROW_HASH_COLUMNS if name in columns]
+    row_hash = combine_hashes(_column_hashes(columns[name], encoded[name]) for name in hashed)
+    if row_hash is None:
+        row_hash = np.zeros(len(records), dtype=np.uint64)
+    layout.append(row_hash.astype("<u8"))
+
+    header = {
+        "rows": len(records),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "columns": header_cols,
+        "row_hash": {"columns": hashed, "block": [rel, row_hash.nbytes]},
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _PREFIX.size + len(header_bytes)
+    data_start += _pad(data_start)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, SNAPSHOT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\x00" * (data_start - f.tell()))
+        for block in layout:
+            raw = block.tobytes() if isinstance(block, np.ndarray) else block
+            f.write(raw)
+            f.write(b"\x00" * _pad(len(raw)))
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a market snapshot"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _PREFIX.size:
+                raise SnapshotError(f"{path}: file too small to be a snapshot")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_header(size)
+        except SnapshotError:
+            self.close()
+            raise
+        except (ValueError, KeyError, TypeError) as e:  # includes JSON and UTF-8 decode errors
+            self.close()
+            raise SnapshotError(f"{path}: corrupt snapshot header ({e})") from e
+        self._dictionaries = {}
+
+    def _read_header(self, size):
+        """Parse the header and check that every block lies inside the file"""
+        path = self.path
+        magic, version, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path}: not a market snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"{path}: unsupported snapshot version {version}")
+        if _PREFIX.size + header_len > size:
+            raise SnapshotError(f"{path}: truncated snapshot header")
+
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_len])
+        data_start = _PREFIX.size + header_len
+        self._data_start = data_start + _pad(data_start)
+        self.rows = int(header["rows"])
+        self.created_at = header.get("created_at")
+        self._columns = {col["name"]: col for col in header["columns"]}
+        self._row_hash = header.get("row_hash")
+
+        blocks = [(col["name"], block) for col in self._columns.values()
+                  for block in col["blocks"].values()]
+        if self._row_hash is not None:
+            blocks.append(("row_hash", self._row_hash["block"]))
+        for name, (offset, length) in blocks:
+            if offset < 0 or length < 0 or self._data_start + offset + length > size:
+                raise SnapshotError(f"{path}: block of column {name} lies outside the file (truncated?)")
+
+    def close(self):
+        """Unmap the file; deferred to GC while column views are still alive"""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def _array(self, offset, size, dtype):
+        count = size // np.dtype(dtype).itemsize
+        return np.frombuffer(self._mmap, dtype=dtype, count=count,
+                             offset=self._data_start + offset)
+
+    def _block(self, col, name, dtype):
+        return self._array(*col["blocks"][name], dtype)
+
+    def kind(self, name):
+        """Storage kind of a column (f8, bool, str or json)"""
+        return self._columns[name]["kind"]
+
+    def dictionary(self, name):
+        """Distinct values of a string column, indexed by its codes (code -1 is None)"""
+        return self._dictionary(self._string_column(name))
+
+    def string_block(self, name):
+        """Zero-copy (offsets, UTF-8 bytes) arrays backing a string column's dictionary"""
+        col = self._string_column(name)
+        return self._block(col, "offsets", "<u4"), self._block(col, "data", "u1")
+
+    def _string_column(self, name):
+        col = self._columns[name]
+        if col["kind"] not in ("str", "json"):
+            raise KeyError(f"{name} is not dictionary encoded")
+        return col
+
+    def _decode_entries(self, col, codes=None):
+        """Decode dictionary entries (all of them, or just the given codes)"""
+        offsets = self._block(col, "offsets", "<u4")
+        data_offset, data_size = col["blocks"]["data"]
+        start = self._data_start + data_offset
+        if codes is None:
+            blob = self._mmap[start:start + data_size]
+            bounds = offsets.tolist()
+            starts, ends = bounds[:-1], bounds[1:]
+            if blob.isascii():
+                # Byte offsets are character offsets: decode once, then slice
+                text = blob.decode("ascii")
+                values = [text[a:b] for a, b in zip(starts, ends)]
+            else:
+                values = [blob[a:b].decode("utf-8") for a, b in zip(starts, ends)]
+        else:
+            starts, ends = offsets[codes].tolist(), offsets[codes + 1].tolist()
+            values = [self._mmap[start + a:start + b].decode("utf-8") for a, b in zip(starts, ends)]
+        if col["kind"] == "json":
+            values = [json.loads(v) for v in values]
+        return values
+
+    def _dictionary(self, col):
+        """Decode (and cache) the distinct values of a string column"""
+        name = col["name"]
+        if name not in self._dictionaries:
+            values = self._decode_entries(col)
+            # Trailing None so that code -1 maps to it
+            dictionary = np.empty(len(values) + 1, dtype=object)
+            for i, value in enumerate(values):
+                dictionary[i] = value
+            dictionary[-1] = None
+            self._dictionaries[name] = dictionary
+        return self._dictionaries[name]
+
+    def column(self, name, rows=None):
+        """
+        Materialize one column
+
+        Args:
+            name: Column name
+            rows: Optional slice or index array to restrict the rows
+
+        Returns:
+            numpy array; numeric and bool columns are zero-copy views of the map
+        """
+        col = self._columns.get(name)
+        if col is None:
+            raise KeyError(name)
+        kind = col["kind"]
+        if kind == "f8":
+            values = self._block(col, "values", "<f8")
+        elif kind == "bool":
+            values = self._block(col, "values", "u1").view(np.bool_)
+        else:
+            codes = self._block(col, "codes", "<i4")
+            if rows is None or name in self._dictionaries:
+                codes = codes if rows is None else codes[rows]
+                return self._dictionary(col)[codes]
+            # Row subset of a column that has not been decoded yet: only
+            # decode the dictionary entries those rows use
+            unique, inverse = np.unique(codes[rows], return_inverse=True)
+            present = unique >= 0
+            values = np.empty(len(unique), dtype=object)
+            for i, value in zip(np.flatnonzero(present).tolist(),
+                                self._decode_entries(col, unique[present])):
+                values[i] = value
+            return values[inverse]
+        return values if rows is None else values[rows]
+
+    def column_hashes(self, name):
+        """Stable 64-bit hash of every value of a column, computed on the mapped blocks"""
+        col = self._columns[name]
+        if col["kind"] in ("f8", "bool"):
+            blocks = {"values": self._block(col, "values", "<f8" if col["kind"] == "f8" else "u1")}
+        else:
+            blocks = {"codes": self._block(col, "codes", "<i4"),
+                      "offsets": self._block(col, "offsets", "<u4"),
+                      "data": self._block(col, "data", "u1")}
+        return _column_hashes(col["kind"], blocks)
+
+    def row_hashes(self, columns=None):
+        """
+        One 64-bit hash per row over the given columns
+
+        Served straight from the file when the columns match the ones hashed
+        at write time (ROW_HASH_COLUMNS by default).
+        """
+        stored = self._row_hash
+        if stored is not None and (columns is None or list(columns) == stored["columns"]):
+            return self._array(*stored["block"], "<u8")
+        return combine_hashes(self.column_hashes(name) for name in (columns or ROW_HASH_COLUMNS))
+
+    def codes(self, name):
+        """Raw dictionary codes of a string column (zero-copy)"""
+        return self._block(self._string_column(name), "codes", "<i4")
+
+    def to_frame(self, columns=None, rows=None):
+        """Build a pandas DataFrame from the selected columns only"""
+        import pandas as pd
+
+        columns = columns or self.columns
+        return pd.DataFrame({name: self.column(name, rows) for name in columns})
+
+    def to_records(self, columns=None, rows=None):
+        """Return the selected columns as a list of JSON-friendly dicts"""
+        columns = columns or self.columns
+        data = {}
+        for name in columns:
+            values = self.column(name, rows)
+            if self._columns[name]["kind"] == "f8":
+                values = [None if np.isnan(v) else float(v) for v in values]
+            else:
+                values = values.tolist()
+            data[name] = values
+        n = len(next(iter(data.values()))) if data else 0
+        return [{name: data[name][i] for name in columns} for i in range(n)]
+
+
+def open_snapshot(path):
+    """Open a snapshot file for reading"""
+    return Snapshot(path)
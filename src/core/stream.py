@@ -0,0 +1,171 @@
+"""
+Fan-out of live quotes to many subscribers.
+
+One QuoteHub sits between a single upstream feed and any number of
+subscribers. The hub refcounts tokens, so the feed only polls the union of
+subscribed tokens however many clients watch each one. Every subscription
+coalesces pending updates per token (a newer quote replaces an unsent one)
+and is throttled to its own minimum interval, so a slow consumer holds at
+most one pending quote per token instead of an ever-growing buffer.
+"""
+from dataclasses import dataclass
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class Quote:
+    token_id: str
+    bid: Optional[float]
+    ask: Optional[float]
+    ts: float
+
+    @property
+    def mid(self):
+        if self.bid is None or self.ask is None:
+            return None
+        return round((self.bid + self.ask) / 2, 6)
+
+    def to_dict(self):
+        return {"token_id": self.token_id, "bid": self.bid, "ask": self.ask,
+                "mid": self.mid, "ts": self.ts}
+
+
+class Subscription:
+    """One client's view of the hub: coalesced, throttled quote batches"""
+
+    def __init__(self, hub, token_ids, min_interval=0.5):
+        self.hub = hub
+        self.token_ids = frozenset(token_ids)
+        self.min_interval = min_interval
+        self.coalesced = 0  # updates replaced before the client read them
+        self._pending: Dict[str, Quote] = {}
+        self._cond = threading.Condition()
+        self._last_sent = 0.0
+        self.closed = False
+
+    def offer(self, quote):
+        with self._cond:
+            if quote.token_id in self._pending:
+                self.coalesced += 1
+            self._pending[quote.token_id] = quote
+            self._cond.notify()
+
+    def drain(self):
+        """Return pending quotes without waiting, ignoring the throttle"""
+        with self._cond:
+            batch, self._pending = list(self._pending.values()), {}
+            return batch
+
+    def next_batch(self, timeout=None):
+        """
+        Wait for the next batch of quotes
+
+        Blocks until quotes are pending and at least min_interval has passed
+        since the previous batch, or until timeout.
+
+        Returns:
+            List of Quotes (empty on timeout or when closed)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.closed:
+                now = time.monotonic()
+                ready_at = self._last_sent + self.min_interval
+                if self._pending and now >= ready_at:
+                    batch, self._pending = list(self._pending.values()), {}
+                    self._last_sent = now
+                    return batch
+                wait = ready_at - now if self._pending else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return []
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+            return []
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class QuoteHub:
+    """Routes upstream quote updates to the subscriptions watching each token"""
+
+    def __init__(self, max_tokens_per_subscription=500):
+        self.max_tokens_per_subscription = max_tokens_per_subscription
+        self._subscribers: Dict[str, set] = {}
+        self._latest: Dict[str, Quote] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, token_ids: Iterable[str], min_interval=0.5):
+        """
+        Subscribe to a token set
+
+        The latest known quote of each token is queued right away so a new
+        client does not wait for the next upstream change.
+        """
+        token_ids = [t for t in dict.fromkeys(token_ids) if t]
+        if not token_ids:
+            raise ValueError("at least one token_id is required")
+        if len(token_ids) > self.max_tokens_per_subscription:
+            raise ValueError(f"at most {self.max_tokens_per_subscription} tokens per subscription")
+        sub = Subscription(self, token_ids, min_interval)
+        with self._lock:
+            for token_id in sub.token_ids:
+                self._subscribers.setdefault(token_id, set()).add(sub)
+            latest = [self._latest[t] for t in sub.token_ids if t in self._latest]
+        for quote in latest:
+            sub.offer(quote)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for token_id in sub.token_ids:
+                subs = self._subscribers.get(token_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        # Nobody watches it any more: stop feeding it
+                        del self._subscribers[token_id]
+                        self._latest.pop(token_id, None)
+
+    def tokens(self):
+        """Tokens with at least one subscriber, i.e. what the feed must poll"""
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, token_id, bid, ask, ts=None):
+        """
+        Push an upstream quote; unchanged quotes are dropped here
+
+        Returns:
+            Number of subscriptions the quote was queued for
+        """
+        with self._lock:
+            subs = self._subscribers.get(token_id)
+            if not subs:
+                return 0
+            previous = self._latest.get(token_id)
+            if previous is not None and previous.bid == bid and previous.ask == ask:
+                return 0
+            quote = Quote(token_id, bid, ask, time.time() if ts is None else ts)
+            self._latest[token_id] = quote
+            subs = list(subs)
+        for sub in subs:
+            sub.offer(quote)
+        return len(subs)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({sub for subs in self._subscribers.values() for sub in subs})
@@ -0,0 +1,214 @@
+"""
+Tests for the alert engine, its Flask endpoints and the webhook notifier
+"""
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import os
+from threading import Event, Thread
+import time
+
+import pytest
+
+from api import create_app
+from conftest import market_record
+from src.api.markets import SnapshotHolder
+from src.clients.webhook import WebhookNotifier
+from src.core.alerts import (AlertClock, AlertEngine, CLOSES_WITHIN, PRICE_ABOVE, PRICE_BELOW,
+                             QueuedNotifier, SPREAD_ABOVE)
+from src.core.snapshot import write_snapshot
+
+
+class WebhookStub:
+    """Local HTTP server recording the JSON bodies POSTed to it"""
+
+    def __init__(self):
+        received = self.received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def webhook():
+    stub = WebhookStub()
+    yield stub
+    stub.close()
+
+
+def test_price_rules_fire_on_cross_only():
+    """Rules fire once when the price crosses their threshold"""
+    engine = AlertEngine()
+    up = engine.add_rule(PRICE_ABOVE, 0.8, token_id="t1")
+    down = engine.add_rule(PRICE_BELOW, 0.3, token_id="t1")
+    engine.add_rule(PRICE_ABOVE, 0.8, token_id="t2")
+
+    assert engine.on_quote("t1", price=0.5) == []
+    assert engine.on_quote("t1", price=0.79) == []
+    fired = engine.on_quote("t1", bid=0.8, ask=0.84)  # mid 0.82
+    assert [a.rule.id for a in fired] == [up.id]
+    assert engine.on_quote("t1", price=0.9) == []  # one-shot
+    assert [a.rule.id for a in engine.on_quote("t1", price=0.3)] == [down.id]
+    assert len(engine) == 1
+
+
+def test_first_quote_fires_rules_already_true():
+    """Without a previous quote, rules whose condition holds fire immediately"""
+    engine = AlertEngine()
+    engine.add_rule(PRICE_ABOVE, 0.6, token_id="t1")
+    engine.add_rule(PRICE_ABOVE, 0.9, token_id="t1")
+    assert [a.rule.threshold for a in engine.on_quote("t1", price=0.7)] == [0.6]
+
+
+def test_rules_added_after_quote_fire_if_already_true():
+    """A rule added after its token was quoted is checked against the last quote"""
+    engine = AlertEngine()
+    engine.on_quote("t1", bid=0.88, ask=0.92)  # no rules yet: price 0.9, spread 0.04
+    above = engine.add_rule(PRICE_ABOVE, 0.8, token_id="t1")
+    assert [a.rule.id for a in engine.fired] == [above.id]
+    assert engine.fired[-1].value == pytest.approx(0.9)
+    engine.add_rule(PRICE_BELOW, 0.5, token_id="t1")
+    engine.add_rule(SPREAD_ABOVE, 0.05, token_id="t1")
+    spread = engine.add_rule(SPREAD_ABOVE, 0.03, token_id="t1")
+    assert [a.rule.id for a in engine.fired] == [above.id, spread.id]
+    assert len(engine) == 2
+    assert [a.rule.threshold for a in engine.on_quote("t1", price=0.4)] == [0.5]
+
+
+def test_spread_and_close_rules():
+    """Spread rules use bid/ask; closes_within rules fire when due"""
+    engine = AlertEngine()
+    spread = engine.add_rule(SPREAD_ABOVE, 0.05, token_id="t1")
+    assert engine.on_quote("t1", bid=0.50, ask=0.52) == []
+    assert [a.rule.id for a in engine.on_quote("t1", bid=0.45, ask=0.55)] == [spread.id]
+
+    now = time.time()
+    closing = engine.add_rule(CLOSES_WITHIN, 2, market_id="m1", end_ts=now + 3 * 3600)
+    assert engine.advance(now) == []
+    fired = engine.advance(now + 3601)
+    assert [a.rule.id for a in fired] == [closing.id]
+    assert fired[0].value == pytest.approx(2.0, abs=0.01)
+
+
+def test_clock_fires_close_rules_without_requests():
+    """The clock thread advances the engine on its own"""
+    engine = AlertEngine()
+    rule = engine.add_rule(CLOSES_WITHIN, 1, market_id="m1", end_ts=time.time() + 3600.1)
+    clock = AlertClock(engine, interval=0.05).start()
+    try:
+        deadline = time.time() + 5
+        while not engine.fired and time.time() < deadline:
+            time.sleep(0.02)
+    finally:
+        clock.stop()
+    assert [a.rule.id for a in engine.fired] == [rule.id]
+    assert clock.ticks > 0 and clock.errors == 0
+
+
+def test_removed_rules_do_not_fire():
+    engine = AlertEngine()
+    rule = engine.add_rule(PRICE_ABOVE, 0.5, token_id="t1")
+    assert engine.remove_rule(rule.id)
+    assert not engine.remove_rule(rule.id)
+    assert engine.on_quote("t1", price=0.9) == []
+
+
+def test_alert_endpoints_notify_webhook(webhook, tmp_path):
+    """Rules registered over the API fire on pushed quotes and reach the webhook"""
+    app = create_app(str(tmp_path / "missing.snap"), alert_notifier=WebhookNotifier(webhook.url))
+    client = app.test_client()
+
+    resp = client.post("/alerts", json={"kind": "price_above", "threshold": 0.8,
+                                        "token_id": "t1", "user": "alice"})
+    assert resp.status_code == 201
+    rule_id = resp.json["id"]
+    assert client.post("/alerts", json={"kind": "price_above", "threshold": 0.8,
+                                        "market_id": "unknown"}).status_code == 400
+    assert [r["id"] for r in client.get("/alerts?user=alice").json["rules"]] == [rule_id]
+
+    resp = client.post("/alerts/quotes", json={"updates": [{"token_id": "t1", "price": 0.85}]})
+    assert [a["rule"]["id"] for a in resp.json["fired"]] == [rule_id]
+    app.extensions["alert_engine"].notifier.join()
+    assert client.post("/alerts/quotes", json={"updates": ["t1", 0.9]}).status_code == 400
+    assert [a["rule"]["id"] for a in webhook.received] == [rule_id]
+    assert client.delete(f"/alerts/{rule_id}").status_code == 404
+
+
+def test_non_finite_numbers_are_rejected(tmp_path):
+    """NaN/inf thresholds and quotes are refused instead of disabling a token's rules"""
+    client = create_app(str(tmp_path / "missing.snap")).test_client()
+    for threshold in ("nan", "inf", float("-inf")):
+        assert client.post("/alerts", json={"kind": "price_above", "threshold": threshold,
+                                            "token_id": "t1"}).status_code == 400
+    rule_id = client.post("/alerts", json={"kind": "price_above", "threshold": 0.8,
+                                           "token_id": "t1"}).json["id"]
+    client.post("/alerts/quotes", json={"updates": [{"token_id": "t1", "price": 0.5}]})
+    for quote in ({"price": "nan"}, {"bid": 0.5, "ask": "inf"}):
+        resp = client.post("/alerts/quotes", json={"updates": [{"token_id": "t1", "price": 0.9},
+                                                               dict(quote, token_id="t1")]})
+        assert resp.status_code == 400
+    resp = client.post("/alerts/quotes", json={"updates": [{"token_id": "t1", "price": 0.95}]})
+    assert [a["rule"]["id"] for a in resp.json["fired"]] == [rule_id]
+
+    engine = AlertEngine()
+    with pytest.raises(ValueError):
+        engine.add_rule(PRICE_ABOVE, float("nan"), token_id="t1")
+    with pytest.raises(ValueError):
+        engine.on_quote("t1", price=float("nan"))
+
+
+def test_slow_delivery_stays_off_the_request_path(tmp_path):
+    """Listeners run outside the snapshot lock and notifications are queued"""
+    release = Event()
+
+    class BlockingNotifier:
+        def __init__(self):
+            self.received = []
+
+        def notify(self, alert):
+            release.wait(5)
+            self.received.append(alert)
+            return True
+
+    blocking = BlockingNotifier()
+    notifier = QueuedNotifier(blocking)
+    started = time.perf_counter()
+    assert notifier.notify("queued")
+    assert time.perf_counter() - started < 1
+
+    path = tmp_path / "markets.snap"
+    write_snapshot([market_record(1, outcomePrices='["0.5", "0.5"]')], path)
+    holder = SnapshotHolder(str(path))
+    holder.get()
+    in_listener = Event()
+
+    def listener(snapshot, log):
+        in_listener.set()
+        release.wait(5)
+
+    holder.listeners.append(listener)
+    write_snapshot([market_record(1, outcomePrices='["0.9", "0.1"]')], path)
+    os.utime(path, ns=(0, 1))
+    reload = Thread(target=holder.get)
+    reload.start()
+    assert in_listener.wait(5)
+    started = time.perf_counter()
+    assert holder.get() is not None  # not blocked by the listener
+    assert time.perf_counter() - started < 1
+    release.set()
+    reload.join()
+    notifier.join()
+    assert blocking.received == ["queued"]
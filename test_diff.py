@@ -0,0 +1,85 @@
+"""
+Tests for change detection between market snapshots
+"""
+from conftest import gamma_market, market_record
+from src.core.diff import columns_from_records, diff_snapshots
+from src.core.filters import is_candidate_record
+from src.core.parse import normalize_market
+from src.core.snapshot import ROW_HASH_COLUMNS, Snapshot, combine_hashes, write_snapshot
+
+
+def _refresh():
+    old = [market_record(i) for i in range(5)]
+    new = [market_record(0), market_record(1, outcomePrices='["0.9", "0.1"]'), market_record(2, closed=True),
+           market_record(4), market_record(5)]
+    return old, new
+
+
+def _check(log):
+    assert log.added == ["5"]
+    assert log.removed == ["3"]
+    assert [c.id for c in log.changed] == ["1", "2"]
+    assert log.changed[0].fields == {"yes_price": (0.5, 0.9), "no_price": (0.5, 0.1)}
+    assert log.changed[1].fields == {"closed": (False, True)}
+    assert log.price_moves == ["1"]
+    assert log.closed == ["2"]
+    assert log.rows == [1, 2, 4]
+
+
+def test_diff_record_columns():
+    """Diff of in-memory column mappings"""
+    old, new = _refresh()
+    log = diff_snapshots(columns_from_records(old), columns_from_records(new), price_threshold=0.1,
+                         with_candidates=False)
+    _check(log)
+
+
+def test_diff_snapshot_files(tmp_path):
+    """Diff of two mapped snapshots uses the stored row hashes and gives the same result"""
+    old, new = _refresh()
+    write_snapshot(old, tmp_path / "old.snap")
+    write_snapshot(new, tmp_path / "new.snap")
+    old_snap, new_snap = Snapshot(tmp_path / "old.snap"), Snapshot(tmp_path / "new.snap")
+
+    # Stored hashes match hashes recomputed from the mapped columns
+    recomputed = combine_hashes(old_snap.column_hashes(name) for name in ROW_HASH_COLUMNS)
+    assert (old_snap.row_hashes() == recomputed).all()
+    log = diff_snapshots(old_snap, new_snap, price_threshold=0.1, with_candidates=False)
+    _check(log)
+
+
+def test_diff_identical_snapshots(tmp_path):
+    """No changes between two writes of the same data"""
+    old, _ = _refresh()
+    write_snapshot(old, tmp_path / "a.snap")
+    write_snapshot(old, tmp_path / "b.snap")
+    log = diff_snapshots(Snapshot(tmp_path / "a.snap"), Snapshot(tmp_path / "b.snap"))
+    assert not log
+    assert log.rows == []
+
+
+def test_diff_candidate_set():
+    """Markets entering and leaving the 48h candidate set are reported"""
+    old = [market_record(0, 24), market_record(1)]
+    new = [market_record(0, 24, closed=True), market_record(1, 24)]
+    log = diff_snapshots(columns_from_records(old), columns_from_records(new))
+    assert log.entered_candidates == ["1"]
+    assert log.left_candidates == ["0"]
+
+
+def test_candidate_set_needs_clob_token_ids(tmp_path):
+    """A conditionId-only market has YES/NO tokens but is not a dashboard candidate"""
+    market = gamma_market(1, 24)
+    del market["clobTokenIds"]
+    market["conditionId"] = "0xabc"
+    record = normalize_market(market)
+    assert record["yes_token_id"] and record["clob_token_ids"] == []
+    assert not is_candidate_record(record)
+
+    old, new = [market_record(0)], [market_record(0), record]
+    log = diff_snapshots(columns_from_records(old), columns_from_records(new))
+    assert log.added == ["1"] and log.entered_candidates == []
+    write_snapshot(old, tmp_path / "old.snap")
+    write_snapshot(new, tmp_path / "new.snap")
+    log = diff_snapshots(Snapshot(tmp_path / "old.snap"), Snapshot(tmp_path / "new.snap"))
+    assert log.added == ["1"] and log.entered_candidates == []
@@ -0,0 +1,89 @@
+"""
+Tests for the headless export pipeline and CLI
+"""
+import json
+import logging
+
+from flask import Flask, jsonify, request
+import pyarrow.parquet as pq
+
+from conftest import StubClob, book, gamma_market
+from src.__main__ import main
+from src.api.replay import ServerThread
+from src.clients.gamma import iter_market_pages
+from src.core.export import EXPORT_COLUMNS, QUOTE_COLUMNS, open_writer, run_export
+
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+
+def gamma_server(n, max_limit=None):
+    """Local Gamma /markets stub; max_limit caps the page size like the real API may"""
+    app = Flask(__name__)
+    markets = [gamma_market(i, hours=24 if i % 2 else 100) for i in range(n)]
+
+    @app.route('/markets')
+    def markets_page():
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", 100))
+        if max_limit is not None:
+            limit = min(limit, max_limit)
+        return jsonify(markets[offset:offset + limit])
+
+    return ServerThread(app)
+
+
+# Only YES tokens have books
+QUOTED_BOOKS = {f"y{i}": book(f"y{i}", bids=[(0.39, 5)], asks=[(0.41, 5)]) for i in range(4)}
+
+
+def test_iter_market_pages():
+    with gamma_server(1234) as server:
+        pages = list(iter_market_pages(page_size=500, concurrency=3, base_url=server.url))
+        assert [len(p) for p in pages] == [500, 500, 234]
+        assert [m["id"] for p in pages for m in p] == [str(i) for i in range(1234)]
+        pages = list(iter_market_pages(page_size=500, concurrency=3, max_markets=700, base_url=server.url))
+        assert [len(p) for p in pages] == [500, 200]
+        pages = list(iter_market_pages(page_size=500, concurrency=3, max_markets=10000, base_url=server.url))
+        assert [len(p) for p in pages] == [500, 500, 234]
+    with gamma_server(1234, max_limit=300) as server:
+        pages = list(iter_market_pages(page_size=500, concurrency=3, base_url=server.url))
+        assert [len(p) for p in pages] == [300, 300, 300, 300, 34]
+        assert [m["id"] for p in pages for m in p] == [str(i) for i in range(1234)]
+        pages = list(iter_market_pages(page_size=500, concurrency=2, max_markets=700, base_url=server.url))
+        assert [len(p) for p in pages] == [300, 300, 100]
+    with gamma_server(200) as server:
+        assert [len(p) for p in iter_market_pages(page_size=500, base_url=server.url)] == [200]
+    with gamma_server(0) as server:
+        assert list(iter_market_pages(page_size=500, base_url=server.url)) == []
+
+
+def test_run_export_focus_and_quotes(tmp_path):
+    pages = [[gamma_market(0, 24, question="Bitcoin above 100k?"),
+              gamma_market(1, 100, question="NFL: Will the Jets win?")],
+             [gamma_market(2, 24, question="Will ETH flip BTC?"),
+              gamma_market(3, 24, question="Will the Lakers win? (basketball)")]]
+    path = str(tmp_path / "out.ndjson")
+    clob = StubClob(QUOTED_BOOKS)
+    with open_writer(path, EXPORT_COLUMNS + QUOTE_COLUMNS) as writer:
+        stats = run_export(pages, writer, clob_client=clob)
+
+    rows = [json.loads(line) for line in open(path)]
+    # Market 1 closes in 100h: not a candidate, so not exported and not a focus pick
+    assert [r["id"] for r in rows] == ["0", "2", "3"]
+    assert [r["focus"] for r in rows] == ["crypto", None, "sports"]
+    assert stats.focus == {"crypto": "0", "sports": "3"}
+    assert rows[0]["yes_bid"] == 0.39 and rows[0]["no_bid"] is None
+    assert len(clob.calls) == 2  # one batched call per page
+    assert (stats.pages, stats.markets, stats.candidates, stats.rows, stats.quoted) == (2, 4, 3, 3, 3)
+
+
+def test_cli_export_parquet(tmp_path, capsys):
+    path = str(tmp_path / "out.parquet")
+    with gamma_server(250) as server:
+        assert main(["export", "-o", path, "--all", "--page-size", "100", "--gamma-url", server.url]) == 0
+    table = pq.read_table(path)
+    assert table.num_rows == 250
+    assert table.column_names == EXPORT_COLUMNS
+    assert sum(table.column("is_candidate").to_pylist()) == 125
+    summary = json.loads(capsys.readouterr().err)
+    assert summary["pages"] == 3 and summary["rows"] == 250
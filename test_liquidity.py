@@ -0,0 +1,54 @@
+"""
+Tests for vectorized liquidity metrics and liquidity-ranked focus selection
+"""
+import math
+
+import pytest
+
+from conftest import StubClob, book
+from src.core.liquidity import liquidity_metrics, market_liquidity
+from src.core.models import MarketRecord
+from src.core.pricing import stack_books
+from src.core.select_focus import liquidity_rank, pick_focus
+
+
+BOOKS = [
+    # mid 0.50: bids within 2c are 0.49 and 0.48, asks 0.51 and 0.52
+    book("y1", [(0.49, 100), (0.48, 50), (0.40, 999)], [(0.51, 30), (0.52, 20), (0.60, 999)]),
+    book("n1", [(0.49, 10)], [(0.53, 10)]),
+    book("y2", [(0.30, 10)], []),  # one-sided
+]
+
+
+def test_metrics():
+    m = liquidity_metrics(stack_books(BOOKS), ["y1", "y2", "y3"], ["n1", "n2", None])
+    assert m["spread"][0] == pytest.approx(0.02)
+    assert m["depth_2c"][0] == 200
+    assert m["imbalance"][0] == pytest.approx((150 - 50) / 200)
+    assert m["overround"][0] == pytest.approx(0.51 + 0.53 - 1)
+    # One-sided book: no spread/overround, depth measured from the best bid
+    assert math.isnan(m["spread"][1]) and math.isnan(m["overround"][1])
+    assert m["depth_2c"][1] == 10 and m["imbalance"][1] == 1
+    # Unknown token: everything missing
+    assert all(math.isnan(m[c][2]) for c in m)
+
+
+def test_market_liquidity_batches():
+    clob = StubClob({b["asset_id"]: b for b in BOOKS})
+    metrics = market_liquidity(clob, ["y1", "y1", None], ["n1", "n1", None])
+    assert clob.calls == [["y1", "n1"]]  # deduped, one batched call
+    assert metrics["spread"][:2] == [pytest.approx(0.02)] * 2 and metrics["spread"][2] is None
+
+
+def test_pick_focus_ranked_by_liquidity():
+    def record(i, question, spread=None, depth=None):
+        return MarketRecord(str(i), None, question, None, None, 24.0, True, True, False,
+                            "y", "n", 0.5, 0.5, None, spread=spread, depth_2c=depth)
+
+    markets = [record(1, "Bitcoin up?", spread=0.08, depth=10),
+               record(2, "NFL game?"),
+               record(3, "ETH up?", spread=0.01, depth=5),
+               record(4, "NBA basketball?", spread=0.03, depth=500),
+               record(5, "BTC flat?", spread=0.01, depth=50)]
+    assert [m.id for m in pick_focus(markets)] == ["1", "2"]
+    assert [m.id for m in pick_focus(markets, key=liquidity_rank)] == ["5", "4"]
@@ -0,0 +1,126 @@
+"""
+Tests for batch position valuation
+"""
+from flask import Flask
+import pytest
+
+from conftest import StubClob, book
+from src.api.clob import register_clob_routes
+from src.api.pricing import register_pricing_routes
+from src.core.pricing import BOOK_UNAVAILABLE, Position, mark_positions, stack_books, value_positions
+
+BOOK = book("t1", bids=[(0.47, 50), (0.48, 100)])  # CLOB order: best bid last
+
+
+def test_vwap_and_slippage():
+    stacked = stack_books([BOOK])
+    buy, sell, partial, missing = value_positions(stacked, [
+        Position("t1", "BUY", 150),
+        Position("t1", "SELL", 100),
+        Position("t1", "SELL", 200),
+        Position("t2", "BUY", 10),
+    ])
+    assert buy.mark == 0.5
+    assert buy.vwap == pytest.approx((100 * 0.52 + 50 * 0.55) / 150)
+    assert buy.slippage == pytest.approx(buy.vwap - 0.5)
+    assert sell.vwap == 0.48 and sell.slippage == pytest.approx(0.02)
+    # Only 150 on the bid side: the rest is left unfilled
+    assert partial.filled == 150
+    assert partial.vwap == pytest.approx((100 * 0.48 + 50 * 0.47) / 150)
+    assert missing.mark is None and missing.vwap is None and missing.filled == 0
+
+
+def test_stack_books_orders_levels():
+    """Levels come out best first whatever the input order; malformed levels are skipped"""
+    clob_order = dict(BOOK, bids=BOOK["bids"][::-1], asks=BOOK["asks"][::-1])
+    stacked = stack_books([clob_order, dict(BOOK, asset_id="t2")])
+    assert stacked.bid_px[:, :2].tolist() == [[0.48, 0.47], [0.48, 0.47]]
+    assert stacked.ask_sz[:, :2].tolist() == [[100, 50], [100, 50]]
+    bad = dict(BOOK, bids=BOOK["bids"] + [{"price": "x", "size": "1"}])
+    assert stack_books([bad]).bid_px.tolist() == [[0.48, 0.47]]
+    asks_only = stack_books([BOOK], sides=("asks",))
+    assert asks_only.best_ask.tolist() == [0.52] and asks_only.bid_sz.sum() == 0
+
+
+def test_mark_positions_dedupes_and_chunks():
+    clob = StubClob()
+    positions = [(f"t{i % 7}", "BUY", 1) for i in range(50)]
+    values = mark_positions(clob, positions, chunk_size=3)
+    assert len(values) == 50
+    assert sorted(t for call in clob.calls for t in call) == [f"t{i}" for i in range(7)]
+    assert max(len(call) for call in clob.calls) == 3
+    assert all(v.vwap == 0.52 for v in values)
+
+    with pytest.raises(ValueError):
+        mark_positions(clob, [("t1", "HOLD", 1)])
+
+
+def test_value_endpoint():
+    app = Flask(__name__)
+    register_pricing_routes(app, StubClob())
+    client = app.test_client()
+
+    response = client.post("/positions/value", json={"positions": [
+        {"token_id": "t1", "side": "sell", "size": 100}]})
+    assert response.status_code == 200
+    result = response.get_json()["results"][0]
+    assert result["side"] == "SELL" and result["vwap"] == 0.48
+
+    assert client.post("/positions/value", json={"positions": []}).status_code == 400
+    for size in ("x", "nan", "inf", -1):
+        bad = client.post("/positions/value", json={"positions": [{"token_id": "t1", "side": "BUY", "size": size}]})
+        assert bad.status_code == 400 and "size" in bad.get_json()["error"]
+    with pytest.raises(ValueError):
+        mark_positions(StubClob(), [("t1", "BUY", float("nan"))])
+
+
+def test_prices_endpoint_batches():
+    """POST /prices goes through the chunked batch call, not one request per pair"""
+    class PricesClob(StubClob):
+        def get_prices(self, requests_data, chunk_size=100):
+            self.calls.append(list(requests_data))
+            return [dict(req, price=0.5) for req in requests_data]
+
+        def get_price(self, token_id, side):
+            raise AssertionError("per-pair upstream call")
+
+    clob = PricesClob()
+    app = Flask(__name__)
+    register_clob_routes(app, clob)
+    response = app.test_client().post("/prices", json={"requests": [
+        {"token_id": "t1", "side": "buy"}, {"token_id": "t2"}, "t3", {"token_id": "t4", "side": "SELL"}]})
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [
+        {"token_id": "t1", "side": "BUY", "price": 0.5},
+        {"token_id": "t2", "side": "", "error": "invalid request"},
+        {"token_id": None, "side": "", "error": "invalid request"},
+        {"token_id": "t4", "side": "SELL", "price": 0.5}]
+    assert clob.calls == [[{"token_id": "t1", "side": "BUY"}, {"token_id": "t4", "side": "SELL"}]]
+
+
+def test_no_books():
+    """An empty or failed book fetch values every position as unknown instead of raising"""
+    (empty,) = value_positions(stack_books([]), [Position("t1", "BUY", 10)])
+    assert empty.mark is None and empty.vwap is None and empty.filled == 0
+
+    app = Flask(__name__)
+    register_pricing_routes(app, StubClob(down={"t1", "t2"}))
+    response = app.test_client().post("/positions/value", json={"positions": [
+        {"token_id": "t1", "side": "BUY", "size": 10}, {"token_id": "t2", "side": "SELL", "size": 5}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r["mark"] for r in body["results"]] == [None, None]
+    assert [r["error"] for r in body["results"]] == [BOOK_UNAVAILABLE] * 2
+    assert body["failed_token_ids"] == ["t1", "t2"]
+
+
+def test_failed_chunks_are_reported():
+    """Tokens of failed chunks are reported, unlike tokens without a book"""
+    clob = StubClob(down={"t3"})
+    books = clob.get_order_books_chunked([f"t{i}" for i in range(6)], chunk_size=2)
+    assert sorted(b["asset_id"] for b in books) == ["t0", "t1", "t4", "t5"]
+    assert sorted(books.failed) == ["t2", "t3"]
+
+    values = mark_positions(clob, [("t0", "BUY", 1), ("t3", "BUY", 1)], chunk_size=1)
+    assert values[0].error is None and values[0].vwap == 0.52
+    assert values[1].error == BOOK_UNAVAILABLE and values[1].vwap is None
@@ -0,0 +1,82 @@
+"""
+Tests for opt-in request tracing and the trace store
+"""
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from flask import Flask
+
+from src.api.profiling import register_profiling
+from src.core.profiling import Trace, TraceStore, in_context, span, traced, tracing
+
+
+@traced("work")
+def work(n):
+    with span("inner", n=n):
+        return n * 2
+
+
+def test_span_tree_and_thread_propagation():
+    assert not tracing()
+    assert work(1) == 2  # no trace active: plain call
+
+    with Trace("root", profile=False) as trace:
+        work(1)
+        with span("pool"):
+            with ThreadPoolExecutor(2) as pool:
+                list(pool.map(in_context(work), [2, 3]))
+    assert not tracing()
+
+    spans = trace.to_dict()["spans"]
+    assert spans["name"] == "root"
+    assert [c["name"] for c in spans["children"]] == ["work", "pool"]
+    assert spans["children"][0]["children"][0]["attrs"] == {"n": 1}
+    assert [c["name"] for c in spans["children"][1]["children"]] == ["work", "work"]
+    assert all(c["duration_ms"] is not None for c in spans["children"])
+
+
+def test_profile_kept_only_when_slow():
+    with Trace("fast", threshold_ms=10_000) as fast:
+        work(1)
+    assert not fast.slow and fast.profile_text is None
+
+    with Trace("slow", threshold_ms=1) as slow:
+        time.sleep(0.01)
+    assert slow.slow and "function calls" in slow.profile_text
+
+
+def test_store_rotation(tmp_path):
+    store = TraceStore(str(tmp_path), max_files=3)
+    ids = []
+    for i in range(5):
+        trace = Trace(f"t{i}", profile=False).start().finish()
+        store.save(trace)
+        ids.append(trace.id)
+        time.sleep(0.01)
+    assert [t["id"] for t in store.list()] == ids[:1:-1]
+    assert store.load(ids[0]) is None
+    assert store.load("../etc/passwd") is None
+
+
+def test_flask_header_toggle(tmp_path):
+    app = Flask(__name__)
+    register_profiling(app, TraceStore(str(tmp_path)))
+
+    @app.route('/work')
+    def work_route():
+        return {"result": work(21)}
+
+    client = app.test_client()
+    plain = client.get("/work")
+    assert plain.get_json() == {"result": 42} and "X-Trace-Id" not in plain.headers
+
+    traced_response = client.get("/work", headers={"X-Profile": "1"})
+    trace_id = traced_response.headers["X-Trace-Id"]
+    assert traced_response.headers["Server-Timing"].startswith("total;dur=")
+
+    trace = client.get(f"/profiles/{trace_id}").get_json()
+    assert trace["spans"]["name"] == "GET /work"
+    assert trace["spans"]["attrs"]["status"] == 200
+    assert trace["spans"]["children"][0]["name"] == "work"
+    assert [t["id"] for t in client.get("/profiles").get_json()["traces"]] == [trace_id]
+    assert client.get("/profiles/missing").status_code == 404
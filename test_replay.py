@@ -0,0 +1,94 @@
+"""
+Tests for recording Gamma/CLOB traffic and replaying it offline
+"""
+import logging
+import time
+
+from flask import Flask, jsonify, request
+import pytest
+
+from src.api.replay import ServerThread, create_record_app, create_replay_app
+from src.clients.clob import ClobAPIClient
+from src.clients.gamma import fetch_markets
+from src.core.fixtures import FixtureSet, FixtureWriter, canonical_body, canonical_query
+
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+
+def _book(token_id, bid):
+    return {"market": "m1", "asset_id": token_id, "timestamp": "0", "last_trade_price": "0.5",
+            "min_order_size": "5", "neg_risk": False, "tick_size": "0.01", "hash": "h",
+            "bids": [{"price": bid, "size": "10"}], "asks": [{"price": "0.6", "size": "10"}]}
+
+
+def fake_upstream():
+    """Stands in for Gamma and CLOB; the book's bid moves on every call"""
+    app = Flask(__name__)
+    calls = {"book": 0}
+
+    @app.route('/markets')
+    def markets():
+        offset = int(request.args.get("offset", 0))
+        limit = int(request.args.get("limit", 2))
+        return jsonify([{"id": str(i), "question": f"Q{i}"} for i in range(offset, offset + limit)])
+
+    @app.route('/book')
+    def book():
+        calls["book"] += 1
+        return jsonify(_book(request.args["token_id"], f"{0.4 + calls['book'] / 100:.2f}"))
+
+    return app
+
+
+@pytest.fixture
+def fixture_file(tmp_path):
+    """Record a short session through the proxy"""
+    path = str(tmp_path / "session.ndjson.gz")
+    with ServerThread(fake_upstream()) as upstream, FixtureWriter(path) as writer:
+        proxy = create_record_app({"gamma": upstream.url, "clob": upstream.url}, writer)
+        with ServerThread(proxy) as server:
+            assert len(fetch_markets(limit=2, offset=4, base_url=f"{server.url}/gamma")) == 2
+            clob = ClobAPIClient(f"{server.url}/clob")
+            bids = [clob.get_order_book("t1").bids[0].price for _ in range(2)]
+            assert bids == ["0.41", "0.42"]
+        assert writer.count == 3
+    return path
+
+
+def test_replay_matches_recording(fixture_file):
+    fixtures = FixtureSet.load(fixture_file)
+    assert fixtures.upstreams() == ["clob", "gamma"]
+    assert all(e.latency_ms >= 0 for e in fixtures.exchanges)
+
+    app = create_replay_app(fixtures, latency="none")
+    with ServerThread(app) as server:
+        # Query parameter order does not matter
+        markets = fetch_markets(offset=4, limit=2, base_url=f"{server.url}/gamma")
+        assert [m["id"] for m in markets] == ["4", "5"]
+        clob = ClobAPIClient(f"{server.url}/clob")
+        # Repeated recordings replay in order, then wrap around
+        assert [clob.get_order_book("t1").bids[0].price for _ in range(3)] == ["0.41", "0.42", "0.41"]
+    assert app.extensions["replay"].to_dict() == {"hits": 4, "misses": 0, "errors": 0}
+
+
+def test_replay_latency_and_errors(fixture_file):
+    fixtures = FixtureSet.load(fixture_file)
+    with ServerThread(create_replay_app(fixtures, latency="fixed:200", speed=2)) as server:
+        started = time.perf_counter()
+        fetch_markets(limit=2, offset=4, base_url=f"{server.url}/gamma")
+        assert 0.09 < time.perf_counter() - started < 0.5
+
+    app = create_replay_app(fixtures, latency="none", error_rate=1.0)
+    with ServerThread(app) as server:
+        with pytest.raises(Exception):
+            fetch_markets(limit=2, offset=4, base_url=f"{server.url}/gamma")
+    assert app.extensions["replay"].errors == 1
+
+    with pytest.raises(ValueError):
+        create_replay_app(fixtures, latency="gaussian:10")
+
+
+def test_canonical_forms():
+    assert canonical_query("b=2&a=1") == canonical_query([("a", "1"), ("b", "2")])
+    assert canonical_body(b'{"b": 1, "a": [1, 2]}') == '{"a":[1,2],"b":1}'
+    assert canonical_body(b"") == ""
@@ -0,0 +1,75 @@
+"""
+Tests for the mmap market snapshot format
+"""
+import math
+
+import pytest
+
+from conftest import gamma_market
+from src.core.parse import normalize_market
+from src.core.snapshot import Snapshot, SnapshotError, write_snapshot
+
+
+def _markets():
+    return [
+        gamma_market(1, slug="btc-100k", question="Will BTC hit 100k?", category="Crypto",
+                     outcomePrices='["0.4", "0.6"]'),
+        gamma_market(2, slug="nfl-final", question="Will the favourite win?", category="Sports",
+                     endDate=None, fpmmLive=False, closed=True, outcomes='["No", "Yes"]',
+                     outcomePrices=None, clobTokenIds=None),
+        gamma_market(3, slug="btc-90k", question="Will BTC hit 90k? ✓", category="Crypto",
+                     endDate="2030-01-02T00:00:00Z", fpmmLive=False, active=False,
+                     outcomePrices='["0.7", "0.3"]'),
+    ]
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Every column reads back as written, including None and unicode"""
+    records = [normalize_market(m) for m in _markets()]
+    path = tmp_path / "markets.snap"
+    assert write_snapshot(records, path) == 3
+
+    with Snapshot(path) as snap:
+        assert len(snap) == 3
+        for name in snap.columns:
+            values = [None if isinstance(v, float) and math.isnan(v) else v
+                      for v in snap.column(name).tolist()]
+            assert values == [r[name] for r in records], name
+
+
+def test_snapshot_partial_materialization(tmp_path):
+    """Only requested columns and rows are returned"""
+    path = tmp_path / "markets.snap"
+    write_snapshot([normalize_market(m) for m in _markets()], path)
+
+    with Snapshot(path) as snap:
+        rows = snap.to_records(["category", "yes_price"], slice(1, 3))
+        assert rows == [{"category": "Sports", "yes_price": None},
+                        {"category": "Crypto", "yes_price": 0.7}]
+        assert snap.codes("category").tolist() == [0, 1, 0]
+        df = snap.to_frame(["slug", "active"])
+        assert list(df.columns) == ["slug", "active"]
+        assert df["active"].tolist() == [True, True, False]
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """Opening a non-snapshot file raises SnapshotError"""
+    path = tmp_path / "markets.json"
+    path.write_text("[]" * 20)
+    with pytest.raises(SnapshotError):
+        Snapshot(path)
+
+
+def test_snapshot_rejects_damaged_files(tmp_path):
+    """Truncated files and corrupt headers raise SnapshotError, not decode errors"""
+    path = tmp_path / "markets.snap"
+    write_snapshot([normalize_market(m) for m in _markets()], path)
+    data = path.read_bytes()
+    header_end = data.index(b"}\x00")
+
+    damaged = tmp_path / "damaged.snap"
+    for raw in (data[:len(data) // 2], data[:header_end - 10],
+                data[:20] + b"{" + data[21:], data[:header_end] + b"x" + data[header_end + 1:]):
+        damaged.write_bytes(raw)
+        with pytest.raises(SnapshotError):
+            Snapshot(damaged)
@@ -0,0 +1,69 @@
+"""
+Import-time and memory budget for a bare API worker
+
+Each check runs in a fresh interpreter so modules already imported by the
+test session do not hide import costs.
+"""
+import json
+import subprocess
+import sys
+
+# Generous budgets: the lazy imports keep an API worker around 0.2s / 50MB,
+# importing py_clob_client eagerly alone costs ~0.75s and ~30MB
+IMPORT_BUDGET_SECONDS = 0.6
+RSS_BUDGET_MB = 70
+HEAVY_MODULES = ("pandas", "py_clob_client", "streamlit", "eth_account", "web3")
+
+
+def _run(code, *flags):
+    result = subprocess.run([sys.executable, *flags, "-c", code],
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_core_importable_without_heavy_deps():
+    """src.core must import with pandas and py_clob_client unavailable"""
+    result = _run(f"""
+import importlib, pkgutil, sys
+class Block:
+    def find_spec(self, name, path=None, target=None):
+        if name.split(".")[0] in {HEAVY_MODULES!r}:
+            raise ImportError("blocked: " + name)
+sys.meta_path.insert(0, Block())
+import src.core
+for info in pkgutil.iter_modules(src.core.__path__):
+    importlib.import_module("src.core." + info.name)
+import src.clients.clob
+print("ok")
+""")
+    assert result.stdout.strip() == "ok"
+
+
+def test_api_worker_import_budget():
+    result = _run(f"""
+import json, resource, sys
+import api
+api.create_app()
+try:
+    # Peak RSS of this process image; ru_maxrss can carry over the parent's peak across exec
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == "darwin" else 1)
+print(json.dumps({{"rss_mb": rss_kb / 1024,
+                  "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+""", "-X", "importtime")
+    report = json.loads(result.stdout)
+    assert report["heavy"] == []
+    assert report["rss_mb"] < RSS_BUDGET_MB
+
+    # -X importtime lines: "import time: self [us] | cumulative | name";
+    # top-level imports (no indentation) add up to the total import time
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit() and not name.startswith("  "):
+                total_us += int(cumulative)
+    assert 0 < total_us / 1e6 < IMPORT_BUDGET_SECONDS
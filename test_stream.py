@@ -0,0 +1,85 @@
+"""
+Tests for the quote fan-out hub, the polling feed and the SSE endpoint
+"""
+import json
+import time
+
+from flask import Flask
+
+from conftest import StubClob
+from src.api.stream import register_stream_routes
+from src.clients.quote_feed import PollingQuoteFeed
+from src.core.stream import QuoteHub
+
+
+def test_hub_fans_out_and_refcounts_tokens():
+    hub = QuoteHub()
+    a = hub.subscribe(["t1", "t2"], min_interval=0)
+    b = hub.subscribe(["t1"], min_interval=0)
+    assert sorted(hub.tokens()) == ["t1", "t2"]
+
+    assert hub.publish("t1", 0.4, 0.6) == 2
+    assert hub.publish("t1", 0.4, 0.6) == 0  # unchanged quote is dropped
+    assert [q.mid for q in a.drain()] == [0.5]
+    assert [q.token_id for q in b.drain()] == ["t1"]
+
+    a.close()
+    assert hub.tokens() == ["t1"]
+    b.close()
+    assert hub.tokens() == []
+
+
+def test_slow_consumer_is_coalesced():
+    """A subscriber that never reads keeps one pending quote per token"""
+    hub = QuoteHub()
+    sub = hub.subscribe(["t1"], min_interval=0)
+    for i in range(1000):
+        hub.publish("t1", i / 2000, 0.9)
+    batch = sub.drain()
+    assert len(batch) == 1 and batch[0].bid == 999 / 2000
+    assert sub.coalesced == 999
+
+
+def test_subscription_throttle():
+    hub = QuoteHub()
+    sub = hub.subscribe(["t1"], min_interval=0.2)
+    hub.publish("t1", 0.1, 0.2)
+    assert len(sub.next_batch(timeout=1)) == 1
+    hub.publish("t1", 0.1, 0.3)
+    started = time.monotonic()
+    assert len(sub.next_batch(timeout=1)) == 1
+    assert time.monotonic() - started >= 0.15
+
+
+def test_feed_polls_once_for_all_subscribers():
+    hub = QuoteHub()
+    subs = [hub.subscribe(["t1", "t2"], min_interval=0) for _ in range(50)]
+    clob = StubClob()
+    feed = PollingQuoteFeed(clob, hub, batch_size=10)
+    assert feed.poll_once() == 2
+    assert len(clob.calls) == 1 and sorted(clob.calls[0]) == ["t1", "t2"]
+    assert all(len(s.drain()) == 2 for s in subs)
+    assert subs[0].drain() == []
+
+
+def test_sse_endpoint_streams_quotes():
+    app = Flask(__name__)
+    hub = QuoteHub()
+    register_stream_routes(app, hub)
+    client = app.test_client()
+
+    assert client.get("/stream/quotes").status_code == 400
+    for interval in ("nan", "inf"):
+        assert client.get(f"/stream/quotes?token_ids=t1&interval={interval}").status_code == 400
+    hub.publish("t1", 0.4, 0.6)  # nobody subscribed yet: dropped
+    resp = client.get("/stream/quotes?token_ids=t1&interval=0.1")
+    assert resp.mimetype == "text/event-stream"
+    frames = resp.response
+    assert next(frames).decode().startswith("event: subscribed")
+    hub.publish("t1", 0.45, 0.55)
+    frame = next(frames).decode()
+    assert frame.startswith("event: quotes")
+    quotes = json.loads(frame.split("data: ", 1)[1])["quotes"]
+    assert quotes == [{"token_id": "t1", "bid": 0.45, "ask": 0.55, "mid": 0.5, "ts": quotes[0]["ts"]}]
+    resp.close()
+    assert hub.tokens() == []